@@ -37,11 +37,18 @@ setup(
 
     packages=["simplesurvey"],
 
+    entry_points={
+        'console_scripts': [
+            'simplesurvey=simplesurvey.cli:main',
+            'simplesurvey-server=simplesurvey.server:main',
+        ],
+    },
+
     install_requires=[
         "numpy == 1.11.0",
         "scipy == 0.18.1",
         "numpy == 1.11.0",
         "termcolor==1.1.0",
-        "pandas >= 0.19.0"
+        "pandas >= 0.25.0"
     ],
 )
@@ -5,3 +5,5 @@
 from simplesurvey.survey import *
 from simplesurvey.scale import *
 from simplesurvey.loader import *
+from simplesurvey.keys import *
+from simplesurvey.cache import *
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from simplesurvey import utilities
+
+
+def _resample_block(args):
+    """ Draw one block of stratified resamples and return per segment sums of the values
+    and of the top box indicator with shape (resamples, segments) """
+    values, top_box, codes, starts, sizes, resamples, seed = args
+    rng = np.random.RandomState(seed)
+    n_segments = len(sizes)
+
+    draws = rng.random_sample((resamples, len(values)))
+    indices = starts[codes] + (draws * sizes[codes]).astype(np.int64)
+
+    bins = (codes + (np.arange(resamples) * n_segments)[:, None]).ravel()
+    length = resamples * n_segments
+    sums = np.bincount(bins, weights=values[indices].ravel(), minlength=length)
+    tops = np.bincount(bins, weights=top_box[indices].ravel(), minlength=length)
+    return sums.reshape(resamples, n_segments), tops.reshape(resamples, n_segments)
+
+
+class Bootstrap():
+    """ Stratified bootstrap of mean and top box scores per segment. Resamples are drawn in
+    blocks of at most block_size resampled rows and every resample in a block is reduced at
+    once with bincount. Results are reproducible for a given seed and block_size. """
+
+    def __init__(self, resamples=1000, confidence=0.95, block_size=10000000, seed=None, processes=None):
+        self.resamples = resamples
+        self.confidence = confidence
+        self.block_size = block_size
+        self.seed = seed
+        self.processes = processes
+
+    def resample(self, values, segments, top_box):
+        """ Return (mean, top_box) arrays of shape (resamples, segments) for values grouped by
+        the integer segment codes """
+        order = np.argsort(segments, kind="mergesort")
+        values = np.asarray(values, dtype=float)[order]
+        codes = np.asarray(segments)[order]
+        top = (values >= top_box).astype(float)
+
+        sizes = np.bincount(codes)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        tasks = [(values, top, codes, starts, sizes, count, seed)
+                 for count, seed in utilities.blocks(self.resamples, len(values), self.block_size, self.seed)]
+        blocks = list(utilities.parallel_map(_resample_block, tasks, self.processes))
+
+        sums = np.concatenate([block[0] for block in blocks])
+        tops = np.concatenate([block[1] for block in blocks])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return sums / sizes, tops / sizes
+
+    def _interval(self, samples):
+        tail = 100 * (1 - self.confidence) / 2
+        return np.percentile(samples, [tail, 100 - tail], axis=0)
+
+    def segment_intervals(self, values, segments, top_box):
+        """ Point estimates and percentile confidence intervals of mean and top box
+        percentage for every segment. Values and segments are aligned series """
+        data = pd.concat([values, segments], axis=1, join="inner").dropna()
+        codes, categories = pd.factorize(data.iloc[:, 1], sort=True)
+        observed = data.iloc[:, 0].values.astype(float)
+
+        means, tops = self.resample(observed, codes, top_box)
+        mean_lower, mean_upper = self._interval(means)
+        top_lower, top_upper = self._interval(tops)
+
+        sizes = np.bincount(codes, minlength=len(categories))
+        columns = ["count", "mean", "mean_lower", "mean_upper", "top_box", "top_box_lower", "top_box_upper"]
+        return pd.DataFrame({"count": sizes,
+                             "mean": np.bincount(codes, weights=observed) / sizes,
+                             "mean_lower": mean_lower,
+                             "mean_upper": mean_upper,
+                             "top_box": np.bincount(codes, weights=observed >= top_box) / sizes,
+                             "top_box_lower": top_lower,
+                             "top_box_upper": top_upper},
+                            index=pd.Index(categories, name=segments.name),
+                            columns=columns)
@@ -0,0 +1,139 @@
+import os
+import pickle
+import hashlib
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+
+from collections import OrderedDict
+
+
+def fingerprint(value):
+    """ Stable digest of a test parameter or column data """
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        return hashlib.sha1(pd.util.hash_pandas_object(value).values.tobytes()).hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+    return repr(value)
+
+
+class ResultCache():
+    """ Content addressed cache of test results keyed by a hash of the column data plus the
+    test class and its parameters. Entries are evicted least recently used first once
+    max_entries or max_bytes is exceeded. With a path, entries persist across runs as one
+    pickle per key and recency is kept in the file modification times. """
+
+    def __init__(self, path=None, max_entries=10000, max_bytes=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._sizes = OrderedDict()
+        self._results = {}
+        self._digests = weakref.WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._scan()
+
+    def _scan(self):
+        entries = [entry for entry in os.scandir(self.path) if entry.name.endswith(".pkl")]
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            self._sizes[entry.name[:-4]] = entry.stat().st_size
+        self._evict()
+
+    def _file(self, key):
+        return os.path.join(self.path, "%s.pkl" % key)
+
+    def _digest(self, column):
+        data = column._data
+        with self._lock:
+            memo = self._digests.get(column)
+        if memo is None or memo[0] is not data:
+            memo = (data, fingerprint(data))
+            with self._lock:
+                self._digests[column] = memo
+        return memo[1]
+
+    def key(self, test, independent, dependent, method="test"):
+        parts = ["%s.%s.%s" % (type(test).__module__, type(test).__name__, method)]
+        parts += ["%s=%s" % (name, fingerprint(value)) for name, value in sorted(vars(test).items())]
+        for column in (independent, dependent):
+            parts += [column.text, self._digest(column)]
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+    def __len__(self):
+        return len(self._sizes)
+
+    @property
+    def size(self):
+        return sum(self._sizes.values())
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "entries": len(self), "bytes": self.size}
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key):
+        if key not in self._sizes:
+            self.misses += 1
+            return None
+
+        if key not in self._results:
+            with open(self._file(key), "rb") as f:
+                self._results[key] = pickle.load(f)
+        if self.path is not None:
+            os.utime(self._file(key))
+
+        self._sizes.move_to_end(key)
+        self.hits += 1
+        return self._results[key]
+
+    def put(self, key, result):
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._put(key, result, payload)
+
+    def _put(self, key, result, payload):
+        if self.path is not None:
+            with open(self._file(key), "wb") as f:
+                f.write(payload)
+
+        self._sizes[key] = len(payload)
+        self._sizes.move_to_end(key)
+        self._results[key] = result
+        self._evict()
+
+    def _evict(self):
+        while self._sizes:
+            over_budget = self.max_bytes is not None and self.size > self.max_bytes
+            if len(self._sizes) <= self.max_entries and not over_budget:
+                break
+            key, _ = self._sizes.popitem(last=False)
+            self._results.pop(key, None)
+            if self.path is not None and os.path.exists(self._file(key)):
+                os.remove(self._file(key))
+
+    def fetch(self, test, independent, dependent, method="test"):
+        """ Cached result of test.<method>(independent, dependent), running it on a miss """
+        key = self.key(test, independent, dependent, method)
+        result = self.get(key)
+        if result is None:
+            result = getattr(test, method)(independent, dependent)
+            self.put(key, result)
+        return result
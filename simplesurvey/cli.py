@@ -0,0 +1,103 @@
+import os
+import sys
+import argparse
+
+from simplesurvey.loader import LoadSurvey
+from simplesurvey.survey import Survey
+from simplesurvey.pipeline import ArtifactStore, Pipeline, Stage, file_digest
+
+
+def load_stage(responses, supplementary):
+    survey = Survey()
+    return {"responses": survey._load(responses),
+            "supplementary": [survey._load(path) for path, _ in supplementary]}
+
+
+def join_stage(raw, natural_key, supplementary, duplicates):
+    survey = Survey().responses(raw["responses"], natural_key=natural_key, duplicates=duplicates)
+    for data, (_, key) in zip(raw["supplementary"], supplementary):
+        survey.supplementary_data(data, natural_key=key, duplicates=duplicates)
+    return survey._join()
+
+
+def process_stage(definition, joined):
+    survey = LoadSurvey(definition)
+    survey._format_data(joined)
+    survey.processed = True
+    return survey.processed_columns()
+
+
+def summarize_stage(definition, columns):
+    survey = LoadSurvey(definition).restore(columns)
+    questions = [question.column for question in survey.questions]
+    return survey.slice(questions).describe(include="all").T
+
+
+def breakdown_stage(definition, columns, threshold, correction):
+    survey = LoadSurvey(definition).restore(columns)
+    return survey.breakdown_by_dimensions(threshold=threshold, correction=correction)
+
+
+def export_stage(output, summary, breakdown):
+    os.makedirs(output, exist_ok=True)
+    summary_path = os.path.join(output, "summary.csv")
+    summary.to_csv(summary_path)
+    breakdown_path = breakdown.to_csv(os.path.join(output, "breakdown.csv"))
+    return [summary_path, breakdown_path]
+
+
+def build_pipeline(args):
+    with open(args.definition) as f:
+        definition = f.read()
+
+    supplementary = [tuple(entry) for entry in args.supplementary]
+    inputs = [file_digest(args.responses)] + [file_digest(path) for path, _ in supplementary]
+    options = (args.natural_key, args.duplicates, supplementary)
+
+    pipeline = Pipeline(ArtifactStore(args.store), workers=args.workers)
+    pipeline.add(Stage("load", lambda: load_stage(args.responses, supplementary), params=inputs))\
+            .add(Stage("join", lambda raw: join_stage(raw, args.natural_key, supplementary, args.duplicates),
+                       inputs=["load"], params=options))\
+            .add(Stage("process", lambda joined: process_stage(definition, joined),
+                       inputs=["join"], params=definition))\
+            .add(Stage("summarize", lambda columns: summarize_stage(definition, columns),
+                       inputs=["process"]))\
+            .add(Stage("breakdown", lambda columns: breakdown_stage(definition, columns, args.threshold, args.correction),
+                       inputs=["process"], params=(args.threshold, args.correction)))\
+            .add(Stage("export", lambda summary, breakdown: export_stage(args.output, summary, breakdown),
+                       inputs=["summarize", "breakdown"], params=args.output, cache=False))
+    return pipeline
+
+
+def parser():
+    parser = argparse.ArgumentParser(prog="simplesurvey",
+                                     description="Run a YAML survey definition against response data")
+    parser.add_argument("definition", help="YAML survey definition")
+    parser.add_argument("--responses", required=True, help="CSV or Excel file of responses")
+    parser.add_argument("--natural-key", default=None, help="Column uniquely identifying a respondent")
+    parser.add_argument("--supplementary", nargs=2, action="append", default=[], metavar=("PATH", "KEY"),
+                        help="Supplementary data joined to responses on KEY, may be repeated")
+    parser.add_argument("--duplicates", default="latest", choices=["latest", "first", "error"],
+                        help="How to resolve duplicate natural keys")
+    parser.add_argument("--output", default="output", help="Directory results are exported to")
+    parser.add_argument("--store", default=".simplesurvey", help="Directory stage artifacts are checkpointed to")
+    parser.add_argument("--workers", type=int, default=2, help="Stages run concurrently")
+    parser.add_argument("--threshold", type=float, default=None, help="Only export results under this pvalue")
+    parser.add_argument("--correction", default=None, choices=["bonferroni", "holm", "fdr_bh"],
+                        help="Multiple comparison correction")
+    return parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    pipeline = build_pipeline(args)
+    pipeline.run()
+
+    for name in pipeline.stages:
+        status = "ran" if name in pipeline.executed else "cached"
+        print("%-10s %s" % (name, status))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
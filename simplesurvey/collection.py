@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from simplesurvey.loader import LoadSurvey
+from simplesurvey import utilities
+
+
+def _process_wave(args):
+    """ Load the survey definition, process one wave of responses and return its data. Runs
+    in a worker process so the definition is passed as yaml rather than a Survey object """
+    definition, source, natural_key, supplementary = args
+    survey = LoadSurvey(definition)
+    survey.responses(source, natural_key=natural_key)
+    for path, key in supplementary:
+        survey.supplementary_data(path, natural_key=key)
+    survey.process()
+    return survey.data
+
+
+class SurveyCollection():
+    """ One survey definition run against many waves of responses. Waves are processed in
+    parallel and kept in a single frame keyed by a wave column """
+
+    wave_column = "wave"
+
+    def __init__(self, definition, processes=None):
+        self.definition = definition
+        self.survey = LoadSurvey(definition)
+        self.processes = processes
+        self.waves = []
+        self._sources = []
+        self._supplementary = []
+        self.data = None
+
+    def add_wave(self, wave, source, natural_key=None):
+        self.waves.append(wave)
+        self._sources.append((source, natural_key))
+        self.data = None
+        return self
+
+    def supplementary_data(self, path_or_dataframe, natural_key=None):
+        """ Supplementary data joined to the responses of every wave """
+        self._supplementary.append((path_or_dataframe, natural_key))
+        self.data = None
+        return self
+
+    def process(self):
+        tasks = [(self.definition, source, key, self._supplementary) for source, key in self._sources]
+        frames = list(utilities.parallel_map(_process_wave, tasks, self.processes))
+
+        for wave, frame in zip(self.waves, frames):
+            frame[self.wave_column] = wave
+
+        self.data = pd.concat(frames, axis=0)
+        self.data[self.wave_column] = pd.Categorical(self.data[self.wave_column], categories=self.waves, ordered=True)
+        return self
+
+    def _scored_questions(self):
+        columns = [question.column for question in self.survey.questions]
+        return [column for column in columns if np.issubdtype(self.data[column].dtype, np.number)]
+
+    def wave_summary(self, dimension=None):
+        """ Count, mean and variance of every scored question per wave (and dimension) in long
+        format """
+        if self.data is None:
+            self.process()
+
+        keys = [self.wave_column] if dimension is None else [self.wave_column, dimension]
+        questions = self._scored_questions()
+        long = self.data[keys + questions].melt(id_vars=keys, var_name="question", value_name="_score").dropna()
+
+        summary = long.groupby(["question"] + keys, observed=True)["_score"].agg(["count", "mean", "var"])
+        return summary.reset_index()
+
+    def deltas(self, dimension=None):
+        """ Wave over wave change in mean score per question (and dimension) with a Welch's
+        t-test for each change """
+        summary = self.wave_summary(dimension)
+        keys = ["question"] if dimension is None else ["question", dimension]
+
+        summary = summary.sort_values(keys + [self.wave_column])
+        previous = summary.groupby(keys, observed=True)[["count", "mean", "var", self.wave_column]].shift(1)
+        changed = previous["count"].notnull().values
+        current, previous = summary[changed], previous[changed]
+
+        v1 = previous["var"].values / previous["count"].values
+        v2 = current["var"].values / current["count"].values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            statistic = (current["mean"].values - previous["mean"].values) / np.sqrt(v1 + v2)
+            dof = (v1 + v2) ** 2 / (v1 ** 2 / (previous["count"].values - 1) + v2 ** 2 / (current["count"].values - 1))
+        pvalue = 2 * stats.t.sf(np.abs(statistic), dof)
+
+        result = current[keys].copy()
+        result["previous_wave"] = previous[self.wave_column].values
+        result[self.wave_column] = current[self.wave_column].values
+        result["previous_mean"] = previous["mean"].values
+        result["mean"] = current["mean"].values
+        result["delta"] = result["mean"] - result["previous_mean"]
+        result["test_statistic"] = statistic
+        result["pvalue"] = pvalue
+        return result.reset_index(drop=True)
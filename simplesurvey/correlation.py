@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from simplesurvey import utilities
+
+
+def dummies(series):
+    """ One 0/1 column per category of a dimension, missing where the dimension is missing """
+    codes, categories = utilities.encode(series)
+    values = (codes[:, None] == np.arange(len(categories))).astype(float)
+    values[codes < 0] = np.nan
+    columns = ["%s=%s" % (series.name, category) for category in categories]
+    return pd.DataFrame(values, index=series.index, columns=columns)
+
+
+class CorrelationResult():
+
+    def __init__(self, method, coefficients, pvalues, counts):
+        self.method = method
+        self.coefficients = coefficients
+        self.pvalues = pvalues
+        self.counts = counts
+
+    def pairs(self):
+        """ Upper triangle of the matrices in long format, one row per pair of columns """
+        first, second = np.triu_indices(len(self.coefficients.columns), k=1)
+        columns = self.coefficients.columns
+        return pd.DataFrame({"column_1": columns[first],
+                             "column_2": columns[second],
+                             "coefficient": self.coefficients.values[first, second],
+                             "pvalue": self.pvalues.values[first, second],
+                             "count": self.counts.values[first, second]},
+                            columns=["column_1", "column_2", "coefficient", "pvalue", "count"])
+
+    def __str__(self):
+        return """Correlation Matrix:
+Method: %s
+Columns: %s""" % (self.method, len(self.coefficients.columns))
+
+
+class CorrelationMatrix():
+    """ Spearman or Kendall tau-b correlation between every pair of columns with pairwise
+    deletion of missing values.
+
+    Both are computed from the joint counts of integer coded columns, taken for every pair at
+    once from the Gram product of one-hot level indicators, so every pair only uses the rows
+    where both columns are present. Spearman
+    correlates the midranks of the pairwise complete margins and Kendall tau-b counts
+    concordant pairs with cumulative sums. Columns with more than max_levels distinct values
+    fall back to scipy's spearmanr or kendalltau on the complete pairs. """
+
+    methods = ("spearman", "kendall")
+
+    def __init__(self, method="spearman", max_levels=100, block_size=10000000):
+        if method not in self.methods:
+            raise ValueError("Unknown correlation method %s expected one of %s" % (method, self.methods))
+        self.method = method
+        self.max_levels = max_levels
+        self.block_size = block_size
+
+    def compute(self, data):
+        data = data.astype(float)
+        if self.method == "spearman":
+            coefficients, pvalues, counts = self._pairwise(data, self._rho, stats.spearmanr)
+        else:
+            coefficients, pvalues, counts = self._pairwise(data, self._tau_b, stats.kendalltau)
+
+        def frame(values):
+            return pd.DataFrame(values, index=data.columns, columns=data.columns)
+
+        return CorrelationResult(self.method, frame(coefficients), frame(pvalues), frame(counts))
+
+    def _pairwise(self, data, statistic, fallback):
+        p = len(data.columns)
+        coded = [utilities.encode(data[column]) for column in data.columns]
+        levels = max([len(categories) for _, categories in coded] + [1])
+
+        coefficients, pvalues, counts = np.eye(p), np.zeros((p, p)), np.zeros((p, p))
+        for column in range(p):
+            counts[column, column] = (coded[column][0] >= 0).sum()
+
+        if levels > self.max_levels:
+            self._scipy(data, fallback, coefficients, pvalues, counts)
+            return coefficients, pvalues, counts
+
+        # Every joint table is a block of the Gram product of one-hot level indicators, with
+        # missing values as all zero rows. The Gram product is built a block of columns at a
+        # time over blocks of rows so neither it nor the indicators exceed block_size
+        width = p * levels
+        indicators = np.column_stack([np.where(code < 0, -1, code + column * levels)
+                                      for column, (code, _) in enumerate(coded)]) if p else None
+        columns = max(1, self.block_size // (levels * width))
+        rows = max(1, self.block_size // max(width, 1))
+        for start in range(0, p - 1, columns):
+            stop = min(start + columns, p - 1)
+            gram = np.zeros(((stop - start) * levels, width))
+            for first in range(0, len(data), rows):
+                onehot = self._one_hot(indicators[first:first + rows], width)
+                gram += onehot[:, start * levels:stop * levels].T.dot(onehot)
+
+            for i in range(start, stop):
+                others = np.arange(i + 1, p)
+                tables = gram[(i - start) * levels:(i - start + 1) * levels, (i + 1) * levels:]
+                tables = tables.reshape(levels, len(others), levels).transpose(1, 0, 2)
+
+                coefficient, pvalue, n = statistic(tables)
+                coefficients[i, others] = coefficients[others, i] = coefficient
+                pvalues[i, others] = pvalues[others, i] = pvalue
+                counts[i, others] = counts[others, i] = n
+
+        return coefficients, pvalues, counts
+
+    def _one_hot(self, indicators, width):
+        """ 0/1 matrix of level indicators. Float32 holds the counts of a block of rows exactly """
+        onehot = np.zeros((len(indicators), width), dtype=np.float32)
+        rows, columns = np.nonzero(indicators >= 0)
+        onehot[rows, indicators[rows, columns]] = 1
+        return onehot
+
+    def _rho(self, tables):
+        """ Spearman rho and its t distribution pvalue for a stack of contingency tables """
+        rows, cols = tables.sum(axis=2), tables.sum(axis=1)
+        n = rows.sum(axis=1)
+        centre = ((n + 1) / 2.0)[:, None]
+        row_ranks = np.cumsum(rows, axis=1) - (rows - 1) / 2.0 - centre
+        col_ranks = np.cumsum(cols, axis=1) - (cols - 1) / 2.0 - centre
+
+        covariance = np.einsum("kab,ka,kb->k", tables, row_ranks, col_ranks)
+        row_variance = (rows * row_ranks ** 2).sum(axis=1)
+        col_variance = (cols * col_ranks ** 2).sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rho = np.clip(covariance / np.sqrt(row_variance * col_variance), -1, 1)
+            t = rho * np.sqrt((n - 2) / (1 - rho ** 2))
+            pvalue = 2 * stats.t.sf(np.abs(t), n - 2)
+        return rho, pvalue, n
+
+    def _tau_b(self, tables):
+        """ Kendall tau-b and its asymptotic pvalue for a stack of contingency tables """
+        # Suffix sums of tables counting cells strictly below-right and below-left of each cell
+        below = tables[:, ::-1].cumsum(axis=1)[:, ::-1]
+        below_right = np.zeros_like(tables)
+        below_right[:, :-1, :-1] = below[:, 1:, ::-1].cumsum(axis=2)[:, :, ::-1][:, :, 1:]
+        below_left = np.zeros_like(tables)
+        below_left[:, :-1, 1:] = below[:, 1:].cumsum(axis=2)[:, :, :-1]
+
+        concordant = (tables * below_right).sum(axis=(1, 2))
+        discordant = (tables * below_left).sum(axis=(1, 2))
+
+        n = tables.sum(axis=(1, 2))
+        rows, cols = tables.sum(axis=2), tables.sum(axis=1)
+        pairs = n * (n - 1) / 2
+        row_ties = (rows * (rows - 1) / 2).sum(axis=1)
+        col_ties = (cols * (cols - 1) / 2).sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = (concordant - discordant) / np.sqrt((pairs - row_ties) * (pairs - col_ties))
+
+            row_terms = (rows * (rows - 1) * (2 * rows + 5)).sum(axis=1)
+            col_terms = (cols * (cols - 1) * (2 * cols + 5)).sum(axis=1)
+            variance = (n * (n - 1) * (2 * n + 5) - row_terms - col_terms) / 18.0
+            variance += (rows * (rows - 1)).sum(axis=1) * (cols * (cols - 1)).sum(axis=1) / (2 * n * (n - 1))
+            variance += (rows * (rows - 1) * (rows - 2)).sum(axis=1) * (cols * (cols - 1) * (cols - 2)).sum(axis=1) / (9 * n * (n - 1) * (n - 2))
+            pvalue = 2 * stats.norm.sf(np.abs(concordant - discordant) / np.sqrt(variance))
+
+        return tau, pvalue, n
+
+    def _scipy(self, data, function, coefficients, pvalues, counts):
+        values = data.values
+        for i, j in zip(*np.triu_indices(len(data.columns), k=1)):
+            present = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            coefficient, pvalue = function(values[present, i], values[present, j])
+            coefficients[i, j] = coefficients[j, i] = coefficient
+            pvalues[i, j] = pvalues[j, i] = pvalue
+            counts[i, j] = counts[j, i] = present.sum()
@@ -0,0 +1,119 @@
+import copy
+import numpy as np
+import pandas as pd
+
+from simplesurvey import utilities
+
+
+class SegmentIndex():
+    """ Packed bitmaps (one bit per respondent) for every (dimension, category) of a processed
+    survey along with integer codes for every column. Segments are selected by combining
+    bitmaps and analysed on the selected positions without rescanning the columns. """
+
+    def __init__(self, data, dimensions):
+        self.data = data
+        self.dimensions = list(dimensions)
+        self.length = len(data)
+        self.codes = {column: utilities.encode(data[column]) for column in data.columns}
+
+        self.bitmaps = {}
+        for dimension in dimensions:
+            codes, categories = self.codes[dimension]
+            for code, category in enumerate(categories):
+                self.bitmaps[(dimension, category)] = np.packbits(codes == code)
+
+    def empty(self):
+        return np.zeros((self.length + 7) // 8, dtype=np.uint8)
+
+    def full(self):
+        return np.packbits(np.ones(self.length, dtype=bool))
+
+    def bitmap(self, dimension, values):
+        """ OR of the bitmaps for any of the values of a dimension """
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+
+        if dimension not in self.dimensions:
+            raise KeyError("No dimension %s in segment index" % dimension)
+
+        result = self.empty()
+        for value in values:
+            if (dimension, value) in self.bitmaps:
+                result |= self.bitmaps[(dimension, value)]
+        return result
+
+    def select(self, **criteria):
+        """ AND across dimensions of the OR of the requested categories of each """
+        result = self.full()
+        for dimension, values in criteria.items():
+            result &= self.bitmap(dimension, values)
+        return result
+
+    def positions(self, bitmap):
+        return np.flatnonzero(np.unpackbits(bitmap)[:self.length])
+
+
+class Segment():
+    """ A selection of respondents from an indexed survey """
+
+    def __init__(self, survey, bitmap):
+        self.survey = survey
+        self.bitmap = bitmap
+        self._positions = None
+
+    @property
+    def index(self):
+        return self.survey.segment_index
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            self._positions = self.index.positions(self.bitmap)
+        return self._positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __and__(self, other):
+        return Segment(self.survey, self.bitmap & other.bitmap)
+
+    def __or__(self, other):
+        return Segment(self.survey, self.bitmap | other.bitmap)
+
+    @property
+    def data(self):
+        return self.index.data.iloc[self.positions]
+
+    def slice(self, columns):
+        return self.index.data[columns].iloc[self.positions]
+
+    def crosstab(self, ind, dep):
+        """ Counts of dep by ind over the segment computed from the cached integer codes """
+        x, x_categories = self.index.codes[ind]
+        y, y_categories = self.index.codes[dep]
+        x, y = x[self.positions], y[self.positions]
+        present = (x >= 0) & (y >= 0)
+
+        rows, cols = len(x_categories), len(y_categories)
+        counts = np.bincount(x[present] * cols + y[present], minlength=rows * cols).reshape(rows, cols)
+        table = pd.DataFrame(counts,
+                             index=pd.Index(x_categories, name=ind),
+                             columns=pd.Index(y_categories, name=dep))
+        return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+    def summarize(self, cols):
+        data = self.slice(cols)
+        if self.survey.weights is None:
+            return self.survey.summarizer(data)
+        return self.survey.summarizer(data, weights=self.survey.weights)
+
+    def _segment_column(self, column):
+        column = copy.copy(column)
+        column._data = self.index.data[column.column].iloc[self.positions].dropna()
+        return column
+
+    def breakdown_by_dimensions(self, threshold=None, correction=None, cache=None):
+        """ breakdown_by_dimensions restricted to the respondents in the segment """
+        questions = [self._segment_column(question) for question in self.survey._filter_questions_for_breakdown()]
+        dimensions = [self._segment_column(dimension) for dimension in self.survey.dimensions]
+        return self.survey._breakdown(questions, dimensions, threshold, correction, cache)
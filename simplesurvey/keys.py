@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+
+class DuplicateKeyException(Exception):
+    pass
+
+
+class NaturalKeyIndex():
+    """ Hashed and sorted natural keys. Keys are hashed and sorted once; duplicates are resolved
+    by policy in the same pass (latest, first or error) and lookups are a searchsorted over the
+    sorted hashes returning row positions, -1 where a key is missing. The sorted keys are kept
+    so a hash match is only a key match when the keys are equal. When an order is given latest
+    and first are decided by it, otherwise by row order. """
+
+    policies = ("latest", "first", "error")
+
+    def __init__(self, keys, duplicates="latest", order=None):
+        if duplicates not in self.policies:
+            raise ValueError("Unknown duplicate policy %s expected one of %s" % (duplicates, self.policies))
+
+        keys = np.asarray(keys)
+        hashes = pd.util.hash_array(keys)
+        codes, _ = pd.factorize(keys)
+        if order is None:
+            order = np.arange(len(keys))
+        # Codes keep keys that collide on their hash apart
+        rows = np.lexsort((np.asarray(order), codes, hashes))
+
+        hashes, codes = hashes[rows], codes[rows]
+        changed = (hashes[1:] != hashes[:-1]) | (codes[1:] != codes[:-1])
+        starts = np.flatnonzero(np.r_[True, changed]) if len(hashes) else np.array([], dtype=int)
+
+        if len(starts) < len(keys) and duplicates == "error":
+            duplicated = pd.unique(keys[pd.Series(keys).duplicated().values])
+            raise DuplicateKeyException("Found duplicate natural keys %s" % list(duplicated[:10]))
+
+        if duplicates == "latest":
+            picks = np.r_[starts[1:], len(hashes)] - 1
+        else:
+            picks = starts
+
+        self.hashes = hashes[picks]
+        self.keys = keys[rows[picks]]
+        self.positions = rows[picks]
+        self.duplicates = len(keys) - len(starts)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def keep(self):
+        """ Positions of the rows kept after resolving duplicates in their original order """
+        return np.sort(self.positions)
+
+    def lookup(self, keys):
+        """ Row position for each key or -1 if the key is not in the index """
+        keys = np.asarray(keys)
+        hashes = pd.util.hash_array(keys)
+        if not len(self.hashes):
+            return np.full(len(hashes), -1, dtype=np.int64)
+
+        found = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        hashed = self.hashes[found] == hashes
+        matched = hashed & (self.keys[found] == keys)
+        positions = np.where(matched, self.positions[found], -1)
+
+        # Hash collisions, scan the other keys sharing the hash
+        for row in np.flatnonzero(hashed & ~matched):
+            slot = found[row] + 1
+            while slot < len(self.hashes) and self.hashes[slot] == hashes[row]:
+                if self.keys[slot] == keys[row]:
+                    positions[row] = self.positions[slot]
+                    break
+                slot += 1
+        return positions
+
+    def take(self, data, keys):
+        """ Rows of data aligned positionally to keys with missing keys filled with NaN """
+        positions = self.lookup(keys)
+        missing = positions < 0
+
+        joined = data.iloc[np.where(missing, 0, positions)] if len(data) else data.reindex(range(len(positions)))
+        if missing.any():
+            joined = joined.where(np.repeat(~missing[:, None], joined.shape[1], axis=1))
+        return joined
@@ -2,4 +2,4 @@ import yaml
 
 
 def LoadSurvey(survey_string):
-    return yaml.load(survey_string)
+    return yaml.load(survey_string, Loader=yaml.Loader)
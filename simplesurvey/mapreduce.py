@@ -0,0 +1,161 @@
+import copy
+import multiprocessing
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from simplesurvey.stats import Chi2TestResult, KruskallWallisTest, KruskallWallisTestResult
+from simplesurvey.results import ResultTable
+from simplesurvey.keys import NaturalKeyIndex
+
+
+class Aggregates():
+    """ Mergeable partial aggregates of processed survey data. Holds value counts of every
+    question and contingency counts of every dimension x question pair, from which moments,
+    medians, crosstabs, chi-square and Kruskal-Wallis tests are reduced exactly. """
+
+    def __init__(self, counts=None, tables=None, labels=None):
+        self.counts = counts if counts is not None else {}
+        self.tables = tables if tables is not None else {}
+        self.labels = labels if labels is not None else {}
+
+    @classmethod
+    def from_survey(cls, survey):
+        aggregates = cls(labels={name: column.text for name, column in survey.columns.items()})
+        data = survey.data
+        for question in [question.column for question in survey.questions]:
+            aggregates.counts[question] = data[question].value_counts()
+            for dimension in survey.dimensions:
+                pair = data[[dimension.column, question]].dropna()
+                aggregates.tables[(dimension.column, question)] = pair.groupby([dimension.column, question]).size()
+        return aggregates
+
+    def merge(self, other):
+        for store, partial in ((self.counts, other.counts), (self.tables, other.tables)):
+            for key, counts in partial.items():
+                store[key] = counts if key not in store else store[key].add(counts, fill_value=0)
+        self.labels.update(other.labels)
+        return self
+
+    def crosstab(self, ind, dep):
+        return self.tables[(ind, dep)].unstack(fill_value=0).sort_index().sort_index(axis=1)
+
+    def summary(self):
+        """ Count, mean, standard deviation and median of every numeric question """
+        rows = {}
+        for question, counts in self.counts.items():
+            counts = counts.sort_index()
+            if not np.issubdtype(counts.index.dtype, np.number):
+                continue
+            values, weights = counts.index.values.astype(float), counts.values.astype(float)
+            n = weights.sum()
+            mean = (values * weights).sum() / n
+            variance = ((values ** 2) * weights).sum() / n - mean ** 2
+            cumulative = np.cumsum(weights)
+            median = (values[np.searchsorted(cumulative, (n + 1) // 2)] + values[np.searchsorted(cumulative, n // 2 + 1)]) / 2.0
+            rows[question] = {"count": n, "mean": mean, "std": np.sqrt(variance * n / (n - 1)), "median": median}
+        return pd.DataFrame(rows, index=["count", "mean", "std", "median"]).T
+
+    def chi2(self, ind, dep):
+        result = stats.chi2_contingency(self.crosstab(ind, dep))
+        return Chi2TestResult(self.labels[dep], self.labels[ind], *result)
+
+    def kruskal(self, ind, dep):
+        """ Kruskal-Wallis H from the counts of each dependent value per group, using midranks
+        of the pooled value counts """
+        table = self.crosstab(ind, dep).values.astype(float)
+        ties = table.sum(axis=0)
+        n = ties.sum()
+        midranks = np.cumsum(ties) - (ties - 1) / 2.0
+
+        sizes = table.sum(axis=1)
+        rank_sums = table.dot(midranks)
+        h = 12.0 / (n * (n + 1)) * (rank_sums ** 2 / sizes).sum() - 3 * (n + 1)
+        h /= 1 - (ties ** 3 - ties).sum() / (n ** 3 - n)
+
+        pvalue = stats.chi2.sf(h, len(sizes) - 1)
+        return KruskallWallisTestResult(self.labels[dep], self.labels[ind], h, pvalue, len(sizes) - 1)
+
+    def breakdown(self, survey, threshold=None, correction=None):
+        """ Reduce every breakdown question x dimension test from the aggregates """
+        results = []
+        for question in survey._filter_questions_for_breakdown():
+            for dimension in survey.dimensions:
+                if dimension.breakdown_by is KruskallWallisTest:
+                    results.append(self.kruskal(dimension.column, question.column))
+                else:
+                    results.append(self.chi2(dimension.column, question.column))
+
+        table = ResultTable.from_results(results)
+        if correction is not None:
+            table.adjust(correction)
+        if threshold is not None:
+            table = table.significant(threshold)
+        return table
+
+
+# Set in the parent before forking so workers inherit the survey (and its eval'd filters)
+# without pickling it
+_survey = None
+
+
+def _partition_keys(partition):
+    options = _survey._partition_options
+    data = _survey._read_partition(partition)
+    order = None if options["order_by"] is None else data[options["order_by"]].values
+    return data[options["natural_key"]].values, order
+
+
+def _kept_rows(survey, mapper):
+    """ Rows of every partition kept once duplicate natural keys are resolved across all the
+    partitions, the same rows process() keeps over the concatenated partitions """
+    options = survey._partition_options
+    keys, orders = zip(*mapper(_partition_keys, survey._partitions))
+
+    order = None if options["order_by"] is None else np.concatenate(orders)
+    keep = NaturalKeyIndex(np.concatenate(keys), duplicates=options["duplicates"], order=order).keep()
+
+    bounds = np.cumsum([0] + [len(partition) for partition in keys])
+    return [keep[(keep >= start) & (keep < stop)] - start for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _tasks(survey, mapper):
+    if survey._partition_options["natural_key"] is None:
+        return [(partition, None) for partition in survey._partitions]
+    return list(zip(survey._partitions, _kept_rows(survey, mapper)))
+
+
+def _aggregate_partition(task):
+    partition, rows = task
+    survey = copy.deepcopy(_survey)
+    data = survey._read_partition(partition)
+    survey._load_partition(data if rows is None else data.iloc[rows])
+    survey._partitions = None
+    survey.process()
+    return Aggregates.from_survey(survey)
+
+
+def aggregate(survey, processes=None):
+    """ Map every response partition of survey through load, filter, transform and encode
+    and reduce the partial aggregates as they complete. Partitions run in forked worker
+    processes when processes is given and fork is available. With a natural key, a first
+    pass reads the keys of every partition so duplicates are resolved across partitions. """
+    global _survey
+    _survey = survey
+
+    try:
+        if processes is None or processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+            partials = map(_aggregate_partition, _tasks(survey, map))
+            return _reduce(partials)
+
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            return _reduce(pool.imap_unordered(_aggregate_partition, _tasks(survey, pool.imap)))
+    finally:
+        _survey = None
+
+
+def _reduce(partials):
+    result = Aggregates()
+    for partial in partials:
+        result.merge(partial)
+    return result
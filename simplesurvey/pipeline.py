@@ -0,0 +1,116 @@
+import os
+import pickle
+import hashlib
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def file_digest(path, chunksize=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunksize), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore():
+    """ Local directory of pickled stage outputs keyed by stage key """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, "%s.pkl" % key)
+
+    def __contains__(self, key):
+        return os.path.exists(self._file(key))
+
+    def load(self, key):
+        with open(self._file(key), "rb") as f:
+            return pickle.load(f)
+
+    def save(self, key, value):
+        # Write then rename so a crashed stage never leaves a partial artifact behind
+        temporary = self._file(key) + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self._file(key))
+
+
+class Stage():
+    """ A named step computing func(*outputs of inputs). The stage key hashes its name, params
+    and the keys of its inputs so it changes whenever anything upstream changes. Stages with
+    cache=False always run. """
+
+    def __init__(self, name, func, inputs=(), params=None, cache=True):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params
+        self.cache = cache
+
+
+class Pipeline():
+    """ DAG of stages checkpointed to an ArtifactStore. Only stages whose key is missing from
+    the store run and independent stages run concurrently on a thread pool """
+
+    def __init__(self, store, workers=1):
+        self.store = store
+        self.workers = workers
+        self.stages = {}
+        self.executed = []
+
+    def add(self, stage):
+        for name in stage.inputs:
+            if name not in self.stages:
+                raise ValueError("Stage %s depends on unknown stage %s" % (stage.name, name))
+        self.stages[stage.name] = stage
+        return self
+
+    def keys(self):
+        keys = {}
+        for name, stage in self.stages.items():
+            parts = [name, repr(stage.params)] + [keys[upstream] for upstream in stage.inputs]
+            keys[name] = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+        return keys
+
+    def _pending(self, keys):
+        return [name for name, stage in self.stages.items() if not stage.cache or keys[name] not in self.store]
+
+    def run(self):
+        """ Run every stage whose output isn't checkpointed and return the outputs loaded or
+        computed along the way by name """
+        keys = self.keys()
+        pending = self._pending(keys)
+        outputs = {}
+        self.executed = []
+
+        def output(name):
+            if name not in outputs:
+                outputs[name] = self.store.load(keys[name])
+            return outputs[name]
+
+        def execute(name):
+            stage = self.stages[name]
+            result = stage.func(*[output(upstream) for upstream in stage.inputs])
+            if stage.cache:
+                self.store.save(keys[name], result)
+            return result
+
+        running = {}
+        with ThreadPoolExecutor(max(1, self.workers)) as executor:
+            while pending or running:
+                ready = [name for name in pending
+                         if not any(upstream in pending or upstream in running.values() for upstream in self.stages[name].inputs)]
+                for name in ready:
+                    pending.remove(name)
+                    running[executor.submit(execute, name)] = name
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outputs[name] = future.result()
+                    self.executed.append(name)
+
+        return outputs
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+
+from simplesurvey import utilities
+
+
+def segment_covariances(data, codes, segments):
+    """ Covariance matrix of the columns of data for every segment at once with shape
+    (segments, items, items). Cross products are one sparse product per item """
+    groups = sparse.csr_matrix((np.ones(len(codes)), (np.arange(len(codes)), codes)), shape=(len(codes), segments))
+    counts = np.bincount(codes, minlength=segments).astype(float)
+    sums = groups.T.dot(data)
+
+    cross = np.empty((segments, data.shape[1], data.shape[1]))
+    for item in range(data.shape[1]):
+        cross[:, item, :] = groups.T.dot(data * data[:, item:item + 1])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centered = cross - sums[:, :, None] * sums[:, None, :] / counts[:, None, None]
+        return centered / (counts - 1)[:, None, None], counts
+
+
+def cronbach(covariances):
+    """ Cronbach's alpha, alpha if item deleted and corrected item-total correlation from a
+    stack of item covariance matrices """
+    items = covariances.shape[-1]
+    variances = np.diagonal(covariances, axis1=1, axis2=2)
+    total = covariances.sum(axis=(1, 2))
+    trace = variances.sum(axis=1)
+    item_sums = covariances.sum(axis=2)
+
+    rest_total = total[:, None] - 2 * item_sums + variances
+    rest_trace = trace[:, None] - variances
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = items / (items - 1.0) * (1 - trace / total)
+        # Deleting an item of a two item construct leaves a single item without an alpha
+        if items < 3:
+            alpha_if_deleted = np.full(rest_total.shape, np.nan)
+        else:
+            alpha_if_deleted = (items - 1.0) / (items - 2.0) * (1 - rest_trace / rest_total)
+        item_total = (item_sums - variances) / np.sqrt(variances * rest_total)
+
+    return alpha, alpha_if_deleted, item_total
+
+
+class ReliabilityResult():
+
+    def __init__(self, construct, items, segments, counts, alpha, alpha_if_deleted, item_total):
+        self.construct = construct
+        self.items = items
+        self.counts = pd.Series(counts, index=segments, name="count")
+        self.alpha = pd.Series(alpha, index=segments, name="alpha")
+        self.alpha_if_deleted = pd.DataFrame(alpha_if_deleted, index=segments, columns=items)
+        self.item_total = pd.DataFrame(item_total, index=segments, columns=items)
+
+    def __str__(self):
+        return """Reliability:
+Construct: %s
+Items: %s
+Alpha: %s""" % (self.construct, len(self.items), self.alpha.to_dict())
+
+
+class Reliability():
+    """ Internal consistency of questions measuring one construct. Questions are grouped by
+    their construct tag, falling back to the scale they share """
+
+    overall = "All"
+
+    def __init__(self, survey):
+        self.survey = survey
+
+    def constructs(self):
+        groups = {}
+        scales = []
+        for question in self.survey.questions:
+            if question.construct is not None:
+                name = question.construct
+            elif question.scale is not None:
+                if question.scale not in scales:
+                    scales.append(question.scale)
+                name = question.scale.name or "scale_%s" % scales.index(question.scale)
+            else:
+                continue
+            groups.setdefault(name, []).append(question.column)
+
+        return {name: columns for name, columns in groups.items() if len(columns) > 1}
+
+    def analyse(self, dimension=None):
+        constructs = self.constructs()
+        columns = sorted(set(column for items in constructs.values() for column in items))
+        if dimension is not None:
+            columns.append(dimension)
+        data = self.survey.slice(columns)
+
+        return {name: self.analyse_items(name, data, items, dimension) for name, items in constructs.items()}
+
+    def analyse_items(self, construct, data, items, dimension=None):
+        keys = items if dimension is None else items + [dimension]
+        complete = data[keys].dropna()
+
+        if dimension is None:
+            codes, segments = np.zeros(len(complete), dtype=np.int64), pd.Index([self.overall])
+        else:
+            codes, segments = utilities.encode(complete[dimension])
+            segments = pd.Index(segments, name=dimension)
+
+        covariances, counts = segment_covariances(complete[items].values.astype(float), codes, len(segments))
+        alpha, alpha_if_deleted, item_total = cronbach(covariances)
+        return ReliabilityResult(construct, items, segments, counts, alpha, alpha_if_deleted, item_total)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from simplesurvey.stats import adjust_pvalues
+
+
+class ResultTable():
+    """ Columnar collection of test results. Statistics, pvalues, degrees of freedom and
+    labels are held as arrays so correction, filtering and export run over whole columns
+    instead of thousands of result objects. """
+
+    columns = ["test", "dependent", "independent", "test_statistic", "pvalue", "adjusted_pvalue", "degrees_of_freedom"]
+
+    def __init__(self, test=(), dependent=(), independent=(), test_statistic=(), pvalue=(), degrees_of_freedom=None, adjusted_pvalue=None):
+        self.test = np.asarray(test, dtype=object)
+        self.dependent = np.asarray(dependent, dtype=object)
+        self.independent = np.asarray(independent, dtype=object)
+        self.test_statistic = np.asarray(test_statistic, dtype=float)
+        self.pvalue = np.asarray(pvalue, dtype=float)
+
+        if degrees_of_freedom is None:
+            degrees_of_freedom = np.full(len(self.pvalue), np.nan)
+        self.degrees_of_freedom = np.asarray(degrees_of_freedom, dtype=float)
+
+        if adjusted_pvalue is None:
+            adjusted_pvalue = self.pvalue
+        self.adjusted_pvalue = np.asarray(adjusted_pvalue, dtype=float)
+
+    @classmethod
+    def allocate(cls, size):
+        """ Empty table of size rows, filled in place with record() """
+        return cls(test=np.empty(size, dtype=object),
+                   dependent=np.empty(size, dtype=object),
+                   independent=np.empty(size, dtype=object),
+                   test_statistic=np.full(size, np.nan),
+                   pvalue=np.full(size, np.nan),
+                   degrees_of_freedom=np.full(size, np.nan))
+
+    def record(self, row, test, dependent, independent, statistic, pvalue, degrees_of_freedom=np.nan):
+        """ Write one test straight into the columns at row """
+        self.test[row] = test
+        self.dependent[row] = dependent
+        self.independent[row] = independent
+        self.test_statistic[row] = statistic
+        self.pvalue[row] = pvalue
+        self.degrees_of_freedom[row] = degrees_of_freedom
+
+    @classmethod
+    def from_results(cls, results):
+        results = list(results)
+        return cls(test=[getattr(result, "test_name", type(result).__name__.replace("Result", "")) for result in results],
+                   dependent=[result.dependent_label for result in results],
+                   independent=[result.independent_label for result in results],
+                   test_statistic=[result.test_statistic for result in results],
+                   pvalue=[result.pvalue for result in results],
+                   degrees_of_freedom=[getattr(result, "degrees_of_freedom", np.nan) for result in results])
+
+    def __len__(self):
+        return len(self.pvalue)
+
+    def _take(self, indexer):
+        return ResultTable(test=self.test[indexer],
+                           dependent=self.dependent[indexer],
+                           independent=self.independent[indexer],
+                           test_statistic=self.test_statistic[indexer],
+                           pvalue=self.pvalue[indexer],
+                           degrees_of_freedom=self.degrees_of_freedom[indexer],
+                           adjusted_pvalue=self.adjusted_pvalue[indexer])
+
+    def adjust(self, method="holm"):
+        """ Apply multiple comparison correction across every test in the table """
+        self.adjusted_pvalue = adjust_pvalues(self.pvalue, method)
+        return self
+
+    def significant(self, threshold, adjusted=True):
+        """ Return a new table of the results whose (adjusted) pvalue falls under threshold """
+        pvalues = self.adjusted_pvalue if adjusted else self.pvalue
+        return self._take(np.flatnonzero(pvalues < threshold))
+
+    def to_frame(self, start=0, stop=None):
+        indexer = slice(start, stop)
+        return pd.DataFrame({column: getattr(self, column)[indexer] for column in self.columns},
+                            columns=self.columns)
+
+    def _chunks(self, chunksize):
+        for start in range(0, max(len(self), 1), chunksize):
+            yield self.to_frame(start, start + chunksize)
+
+    def to_csv(self, path, chunksize=100000):
+        """ Stream the table to csv in chunks of rows """
+        with open(path, "w") as f:
+            for number, chunk in enumerate(self._chunks(chunksize)):
+                chunk.to_csv(f, header=number == 0, index=False)
+        return path
+
+    def to_parquet(self, path, chunksize=100000):
+        """ Stream the table to parquet with one row group per chunk. Requires pyarrow """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow is required to write parquet files")
+
+        writer = None
+        try:
+            for chunk in self._chunks(chunksize):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+    def __str__(self):
+        return """Result Table:
+Tests: %s
+Significant at 0.05: %s""" % (len(self), int((self.adjusted_pvalue < 0.05).sum()))
@@ -3,7 +3,7 @@ import yaml
 
 class OrdinalScale:
 
-    def __init__(self, labels=None, ratings=None, default_value=0):
+    def __init__(self, labels=None, ratings=None, default_value=0, name=None):
         assert len(labels) == len(ratings), "All labels need an associated rating"
 
         if labels is None:
@@ -15,6 +15,7 @@ class OrdinalScale:
         self._ratings = ratings
 
         self._default_value = default_value
+        self.name = name
 
     @property
     def ratings(self):
@@ -31,6 +32,7 @@ class OrdinalScale:
 def ordinal_scale_constructor(loader, node):
     values = loader.construct_mapping(node)
     return OrdinalScale(labels=values.get("labels"),
-                        ratings=values.get("ratings"))
+                        ratings=values.get("ratings"),
+                        name=values.get("name"))
 
 yaml.add_constructor("!OrdinalScale", ordinal_scale_constructor)
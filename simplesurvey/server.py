@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import argparse
+import threading
+
+from collections import OrderedDict
+from socketserver import ThreadingMixIn
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from simplesurvey.loader import LoadSurvey
+
+
+class SurveySource():
+    """ Files a processed survey is built from. The version changes whenever any file does """
+
+    def __init__(self, definition, responses, natural_key=None, supplementary=()):
+        self.definition = definition
+        self.responses = responses
+        self.natural_key = natural_key
+        self.supplementary = list(supplementary)
+
+    def paths(self):
+        return [self.definition, self.responses] + [path for path, _ in self.supplementary]
+
+    def version(self):
+        return tuple(os.stat(path).st_mtime_ns for path in self.paths())
+
+    def load(self):
+        with open(self.definition) as f:
+            survey = LoadSurvey(f.read())
+
+        survey.responses(self.responses, natural_key=self.natural_key)
+        for path, key in self.supplementary:
+            survey.supplementary_data(path, natural_key=key)
+
+        return survey.freeze()
+
+
+class SurveyRegistry():
+    """ Processed surveys held in memory under an LRU budget of total bytes, with a response
+    cache of rendered query results. Surveys whose files change are reloaded in the
+    background and swapped in once processed. """
+
+    queries = ("crosstab", "summarize", "slice", "breakdown")
+
+    def __init__(self, max_bytes=1 << 30, max_responses=1024):
+        self.max_bytes = max_bytes
+        self.max_responses = max_responses
+        self.sources = {}
+        self.hits = 0
+        self.misses = 0
+
+        self._surveys = OrderedDict()
+        self._responses = OrderedDict()
+        self._lock = threading.RLock()
+        self._reloading = set()
+        self._loading = {}
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def register(self, name, source):
+        with self._lock:
+            self.sources[name] = source
+            self._surveys.pop(name, None)
+        return self
+
+    @property
+    def size(self):
+        return sum(size for _, _, size in self._surveys.values())
+
+    def _store(self, name, version, survey):
+        size = int(survey.data.memory_usage(deep=True).sum())
+        with self._lock:
+            self._surveys[name] = (version, survey, size)
+            self._surveys.move_to_end(name)
+            for key in [key for key in self._responses if key[0] == name and key[1] != version]:
+                del self._responses[key]
+
+            while len(self._surveys) > 1 and self.size > self.max_bytes:
+                evicted, _ = self._surveys.popitem(last=False)
+                for key in [key for key in self._responses if key[0] == evicted]:
+                    del self._responses[key]
+
+    def _held(self, name):
+        with self._lock:
+            if name not in self.sources:
+                raise KeyError("No survey registered as %s" % name)
+            if name not in self._surveys:
+                return None
+            self._surveys.move_to_end(name)
+            version, survey, _ = self._surveys[name]
+            return version, survey
+
+    def get(self, name):
+        """ Return (version, survey) loading the survey if it isn't held in memory. Concurrent
+        first requests for a survey wait on one load under a per survey lock """
+        held = self._held(name)
+        if held is not None:
+            return held
+
+        with self._lock:
+            loading = self._loading.setdefault(name, threading.Lock())
+        with loading:
+            held = self._held(name)
+            if held is not None:
+                return held
+
+            source = self.sources[name]
+            version = source.version()
+            survey = source.load()
+            self._store(name, version, survey)
+            return version, survey
+
+    def reload(self, name):
+        """ Reload a survey on a background thread, serving the old one until it's ready """
+        with self._lock:
+            if name in self._reloading:
+                return None
+            self._reloading.add(name)
+
+        def run():
+            try:
+                source = self.sources[name]
+                version = source.version()
+                self._store(name, version, source.load())
+            finally:
+                with self._lock:
+                    self._reloading.discard(name)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def check(self):
+        """ Reload every held survey whose source files changed """
+        with self._lock:
+            held = [(name, version) for name, (version, _, _) in self._surveys.items()]
+        for name, version in held:
+            try:
+                changed = self.sources[name].version() != version
+            except OSError:
+                continue
+            if changed:
+                self.reload(name)
+
+    def watch(self, interval=1.0):
+        def run():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def query(self, name, kind, params):
+        """ Rendered JSON result of a query, served from the response cache when possible """
+        if kind not in self.queries:
+            raise KeyError("Unknown query %s" % kind)
+
+        version, survey = self.get(name)
+        key = (name, version, kind, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._responses:
+                self.hits += 1
+                self._responses.move_to_end(key)
+                return self._responses[key]
+            self.misses += 1
+
+        body = self._render(survey, kind, params)
+        with self._lock:
+            self._responses[key] = body
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return body
+
+    def _render(self, survey, kind, params):
+        columns = [column for column in params.get("cols", "").split(",") if column]
+        if kind == "crosstab":
+            result = survey.crosstab(params["ind"], params["dep"])
+        elif kind == "summarize":
+            result = survey.summarize(columns).average().median().row_summary()
+        elif kind == "slice":
+            result = survey.slice(columns)
+        else:
+            threshold = float(params["threshold"]) if "threshold" in params else None
+            result = survey.breakdown_by_dimensions(threshold=threshold, correction=params.get("correction")).to_frame()
+        return result.to_json(orient="split").encode("utf-8")
+
+
+class SurveyRequestHandler(BaseHTTPRequestHandler):
+    """ GET /surveys lists surveys and GET /surveys/<name>/<query>?params runs a query """
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        registry = self.server.registry
+
+        if parts == ["surveys"]:
+            return self._send(200, json.dumps(sorted(registry.sources)).encode("utf-8"))
+
+        if len(parts) != 3 or parts[0] != "surveys":
+            return self._error(404, "Not found")
+
+        name, kind = parts[1], parts[2]
+        if name not in registry.sources or kind not in registry.queries:
+            return self._error(404, "Unknown survey or query")
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = registry.query(name, kind, params)
+        except (KeyError, ValueError) as e:
+            return self._error(400, str(e))
+        except Exception as e:
+            return self._error(500, "%s: %s" % (type(e).__name__, e))
+        self._send(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SurveyServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, registry, host="127.0.0.1", port=0):
+        HTTPServer.__init__(self, (host, port), SurveyRequestHandler)
+        self.registry = registry
+
+    @property
+    def url(self):
+        return "http://%s:%s" % self.server_address[:2]
+
+    def start(self):
+        """ Serve on a background thread """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.registry.stop()
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="simplesurvey-server", description="Serve processed surveys on localhost")
+    parser.add_argument("--survey", nargs="+", action="append", required=True,
+                        metavar="NAME DEFINITION RESPONSES [NATURAL_KEY]",
+                        help="Survey to serve, may be repeated")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-bytes", type=int, default=1 << 30, help="Memory budget for processed surveys")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between checks for changed files")
+    args = parser.parse_args(argv)
+
+    registry = SurveyRegistry(max_bytes=args.max_bytes)
+    for survey in args.survey:
+        if len(survey) not in (3, 4):
+            parser.error("--survey takes NAME DEFINITION RESPONSES [NATURAL_KEY]")
+        registry.register(survey[0], SurveySource(*survey[1:]))
+
+    server = SurveyServer(registry.watch(args.interval), host=args.host, port=args.port)
+    print("Serving surveys on %s" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import scipy.stats as stats
+import numpy as np
 import pandas as pd
 
 from simplesurvey import utilities
@@ -19,29 +20,277 @@ class Chi2Test():
         result = stats.chi2_contingency(observed=observed)
         return self._build_result(independent.text, dependent.text, result)
 
+    def statistics(self, independent, dependent):
+        """ (statistic, pvalue, degrees of freedom) of the test without building a result """
+        observed = self._generate_observed(independent._data, dependent._data)
+        statistic, pvalue, dof, _ = stats.chi2_contingency(observed=observed)
+        return statistic, pvalue, dof
+
     def _build_result(self, independent_label, dependent_label, result):
         return Chi2TestResult(dependent_label, independent_label,  *result)
 
 
-class KruskallWallisTest():
+def _permutation_batch(args):
+    """ Count how many of a batch of shuffled tables reach the observed statistic. Each
+    shuffle of the dependent codes is an O(n) permutation written straight into the bins
+    of its table and the whole batch is tabulated with a single bincount """
+    x, y, shape, expected, observed, permutations, seed = args
+    rng = np.random.RandomState(seed)
+    cells = shape[0] * shape[1]
+
+    rows = x * shape[1]
+    bins = np.empty((permutations, len(y)), dtype=np.int64)
+    for offset, row in enumerate(bins):
+        row[:] = rng.permutation(y)
+        row += rows + offset * cells
+    tables = np.bincount(bins.ravel(), minlength=permutations * cells).reshape(permutations, cells)
+
+    statistics = ((tables - expected) ** 2 / expected).sum(axis=1)
+    return int((statistics >= observed * (1 - 1e-7)).sum())
+
+
+class MonteCarloChi2Test():
+    """ Chi-square test of independence with a Monte Carlo permutation pvalue for sparse
+    tables where the asymptotic pvalue is unreliable. Permutations run in batches of at
+    most batch_size permutations and block_size shuffled codes, and stop early once the
+    pvalue is decided relative to threshold at the given confidence. Results are
+    reproducible for a given seed, batch_size and block_size. """
+
+    def __init__(self, permutations=10000, batch_size=500, block_size=10000000, threshold=0.05, confidence=0.999,
+                 seed=0, processes=None):
+        self.permutations = permutations
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.threshold = threshold
+        self.confidence = confidence
+        self.seed = seed
+        self.processes = processes
+
+    def _decided(self, exceeded, run):
+        if self.threshold is None:
+            return False
+        alpha = 1 - self.confidence
+        lower = stats.beta.ppf(alpha / 2, exceeded, run - exceeded + 1) if exceeded > 0 else 0.0
+        upper = stats.beta.ppf(1 - alpha / 2, exceeded + 1, run - exceeded) if exceeded < run else 1.0
+        return upper < self.threshold or lower > self.threshold
+
+    def _compute(self, independent, dependent):
+        x, _, y, _ = utilities.aligned_codes(independent._data, dependent._data)
+        shape = (x.max() + 1, y.max() + 1)
+        table = np.bincount(x * shape[1] + y, minlength=shape[0] * shape[1]).reshape(shape)
+
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / float(len(x))
+        observed = ((table - expected) ** 2 / expected).sum()
+
+        block_size = min(self.block_size, self.batch_size * len(x))
+        blocks = utilities.blocks(self.permutations, len(x), block_size, self.seed)
+        tasks = [(x, y, shape, expected.ravel(), observed, size, seed) for size, seed in blocks]
+
+        exceeded, run = 0, 0
+        batches = utilities.parallel_map(_permutation_batch, tasks, self.processes)
+        for (size, _), count in zip(blocks, batches):
+            exceeded, run = exceeded + count, run + size
+            if self._decided(exceeded, run):
+                break
+        batches.close()
+
+        dof = (shape[0] - 1) * (shape[1] - 1)
+        return observed, (exceeded + 1.0) / (run + 1.0), dof, expected, run
 
     def test(self, independent, dependent):
-        groups = []
+        statistic, pvalue, dof, expected, run = self._compute(independent, dependent)
+        result = Chi2TestResult(dependent.text, independent.text, statistic, pvalue, dof, expected,
+                                test_name=type(self).__name__)
+        result.permutations = run
+        return result
+
+    def statistics(self, independent, dependent):
+        return self._compute(independent, dependent)[:3]
+
+
+class RaoScottChi2Test():
+    """ Chi-square test of independence on weighted counts with the first-order Rao-Scott
+    correction. The Pearson statistic on the weighted proportions is divided by the mean
+    generalized design effect, estimated from the linearized variances of the cell, row
+    and column proportions. """
+
+    def __init__(self, weights):
+        self.weights = weights
+
+    def _compute(self, independent, dependent):
+        data = pd.concat([independent._data, dependent._data, self.weights], axis=1, join="inner").dropna()
+        x, _ = utilities.encode(data.iloc[:, 0])
+        y, _ = utilities.encode(data.iloc[:, 1])
+        weights = data.iloc[:, 2].values.astype(float)
+        rows, cols = x.max() + 1, y.max() + 1
+        n, total, squares = len(weights), weights.sum(), (weights ** 2).sum()
 
-        data = pd.merge(independent._data, dependent._data, left_index=True, right_index=True)
-        for _, group in data.groupby(independent.column):
-            groups.append(group)
+        def variances(codes, size):
+            # Linearized variance of each weighted proportion, sum(w^2 (indicator - p)^2) / total^2
+            proportions = np.bincount(codes, weights=weights, minlength=size) / total
+            in_cell = np.bincount(codes, weights=weights ** 2, minlength=size)
+            return proportions, ((1 - 2 * proportions) * in_cell + proportions ** 2 * squares) / total ** 2
 
+        proportions, cell_variance = variances(x * cols + y, rows * cols)
+        row_proportions, row_variance = variances(x, rows)
+        col_proportions, col_variance = variances(y, cols)
+        proportions, cell_variance = proportions.reshape(rows, cols), cell_variance.reshape(rows, cols)
+        independence = np.outer(row_proportions, col_proportions)
+
+        dof = (rows - 1) * (cols - 1)
+        pearson = n * ((proportions - independence) ** 2 / independence).sum()
+        # (1 - p) d = n var / p for every proportion p with design effect d. Empty cells have
+        # no respondents to estimate d from and take the Kish design effect of the weights
+        kish = n * squares / total ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cell_effects = np.where(proportions > 0, cell_variance / proportions, kish / n).sum()
+        margin_effects = (row_variance / row_proportions).sum() + (col_variance / col_proportions).sum()
+        mean_design_effect = n * (cell_effects - margin_effects) / dof
+
+        statistic = pearson / mean_design_effect
+        return statistic, stats.chi2.sf(statistic, dof), dof, n * independence
+
+    def test(self, independent, dependent):
+        return Chi2TestResult(dependent.text, independent.text, *self._compute(independent, dependent),
+                              test_name=type(self).__name__)
+
+    def statistics(self, independent, dependent):
+        return self._compute(independent, dependent)[:3]
+
+
+class KruskallWallisTest():
+
+    def _groups(self, independent, dependent):
+        """ Dependent values split by the codes of the independent categories """
+        data = pd.concat([independent._data, dependent._data], axis=1, join="inner").dropna()
+        codes, categories = utilities.encode(data.iloc[:, 0])
+        values = data.iloc[:, 1].values.astype(float)
+        return [values[codes == code] for code in range(len(categories))]
+
+    def test(self, independent, dependent):
+        groups = self._groups(independent, dependent)
         result = stats.mstats.kruskalwallis(*groups)
-        return self._build_result(independent.text, dependent.text, *result)
+        return self._build_result(independent.text, dependent.text, *result, degrees_of_freedom=len(groups) - 1)
+
+    def statistics(self, independent, dependent):
+        groups = self._groups(independent, dependent)
+        hstatistic, pvalue = stats.mstats.kruskalwallis(*groups)
+        return hstatistic, pvalue, len(groups) - 1
+
+    def _build_result(self, independent_label, dependent_label, hstatistic, pvalue, degrees_of_freedom=np.nan):
+        return KruskallWallisTestResult(dependent_label, independent_label, hstatistic, pvalue, degrees_of_freedom)
+
+
+def adjust_pvalues(pvalues, method="holm"):
+    """ Multiple comparison correction over an array of pvalues. Supports bonferroni,
+    holm and fdr_bh (Benjamini-Hochberg). Missing pvalues are ignored and stay missing """
+    pvalues = np.asarray(pvalues, dtype=float)
+    if method is None:
+        return pvalues.copy()
+
+    adjusted = np.full(pvalues.shape, np.nan)
+    observed = ~np.isnan(pvalues)
+    p = pvalues[observed]
+    m = len(p)
+    if m == 0:
+        return adjusted
+
+    if method == "bonferroni":
+        result = p * m
+    elif method == "holm":
+        order = np.argsort(p, kind="mergesort")
+        ranked = np.maximum.accumulate(p[order] * (m - np.arange(m)))
+        result = np.empty(m)
+        result[order] = ranked
+    elif method == "fdr_bh":
+        order = np.argsort(p, kind="mergesort")
+        ranked = p[order] * m / np.arange(1, m + 1)
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        result = np.empty(m)
+        result[order] = ranked
+    else:
+        raise ValueError("Unknown correction method %s" % method)
+
+    adjusted[observed] = np.minimum(result, 1.0)
+    return adjusted
 
-    def _build_result(self, independent_label, dependent_label, hstatistic, pvalue):
-        return KruskallWallisTestResult(dependent_label, independent_label, hstatistic, pvalue)
+
+class PairwiseChi2Test():
+    """ Post-hoc 2xk chi-square tests between every pair of categories of the independent
+    column. Category counts are tabulated once and all pairs are tested in one pass. """
+
+    def __init__(self, correction="holm", yates=True):
+        self.correction = correction
+        self.yates = yates
+
+    def _counts(self, independent, dependent):
+        x, x_categories, y, y_categories = utilities.aligned_codes(independent, dependent)
+        rows, cols = len(x_categories), len(y_categories)
+        counts = np.bincount(x * cols + y, minlength=rows * cols).reshape(rows, cols)
+        return counts.astype(float), x_categories
+
+    def test(self, independent, dependent):
+        counts, categories = self._counts(independent._data, dependent._data)
+        first, second = np.triu_indices(len(categories), k=1)
+
+        a, b = counts[first], counts[second]
+        col_totals = a + b
+        present = col_totals > 0
+        total = col_totals.sum(axis=1, keepdims=True)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected_a = a.sum(axis=1, keepdims=True) * col_totals / total
+            expected_b = b.sum(axis=1, keepdims=True) * col_totals / total
+
+            dof = present.sum(axis=1) - 1
+            diff_a, diff_b = np.abs(a - expected_a), np.abs(b - expected_b)
+            if self.yates:
+                corrected = (dof == 1)[:, None]
+                diff_a = np.where(corrected, diff_a - np.minimum(0.5, diff_a), diff_a)
+                diff_b = np.where(corrected, diff_b - np.minimum(0.5, diff_b), diff_b)
+
+            cells = diff_a ** 2 / expected_a + diff_b ** 2 / expected_b
+            statistic = np.where(present, cells, 0.0).sum(axis=1)
+            pvalue = np.where(dof > 0, stats.chi2.sf(statistic, np.maximum(dof, 1)), np.nan)
+
+        pairs = list(zip(categories[first], categories[second]))
+        return PairwiseTestResult(dependent.text, independent.text, pairs, statistic, pvalue,
+                                  adjust_pvalues(pvalue, self.correction), degrees_of_freedom=dof)
+
+
+class PairwiseRankTest():
+    """ Dunn's post-hoc rank test between every pair of categories of the independent
+    column. The dependent is ranked once and pairs are compared on their mean ranks. """
+
+    def __init__(self, correction="holm"):
+        self.correction = correction
+
+    def test(self, independent, dependent):
+        x, categories, y, _ = utilities.aligned_codes(independent._data, dependent._data)
+        n = len(y)
+        ranks = stats.rankdata(y)
+        sizes = np.bincount(x, minlength=len(categories)).astype(float)
+        mean_ranks = np.bincount(x, weights=ranks, minlength=len(categories)) / sizes
+
+        ties = np.bincount(y).astype(float)
+        tie_term = (ties ** 3 - ties).sum() / (12.0 * (n - 1)) if n > 1 else 0.0
+        variance = n * (n + 1) / 12.0 - tie_term
+
+        first, second = np.triu_indices(len(categories), k=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            statistic = (mean_ranks[first] - mean_ranks[second]) / \
+                np.sqrt(variance * (1.0 / sizes[first] + 1.0 / sizes[second]))
+        pvalue = 2 * stats.norm.sf(np.abs(statistic))
+
+        pairs = list(zip(categories[first], categories[second]))
+        return PairwiseTestResult(dependent.text, independent.text, pairs, statistic, pvalue,
+                                  adjust_pvalues(pvalue, self.correction))
 
 
 class Chi2TestResult():
 
-    def __init__(self, dependent_label, independent_label, chi2_statistic, pvalue, degrees_of_freedom, expected):
+    def __init__(self, dependent_label, independent_label, chi2_statistic, pvalue, degrees_of_freedom, expected, test_name="Chi2Test"):
+        self.test_name = test_name
         self.independent_label = independent_label
         self.dependent_label = dependent_label
         self.chi2_statistic = chi2_statistic
@@ -62,11 +311,14 @@ Result: pvalue=%s test_statistic=%s """ % (self.dependent_label, self.independen
 
 class KruskallWallisTestResult():
 
-    def __init__(self, dependent_label, independent_label, hstat, pvalue):
+    test_name = "KruskallWallisTest"
+
+    def __init__(self, dependent_label, independent_label, hstat, pvalue, degrees_of_freedom=np.nan):
         self.dependent_label = dependent_label
         self.independent_label = independent_label
         self.hstatistic = hstat
         self.pvalue = pvalue
+        self.degrees_of_freedom = degrees_of_freedom
 
     @property
     def test_statistic(self):
@@ -77,3 +329,41 @@ class KruskallWallisTestResult():
 Dependent: %s
 Independent: %s
 Result: pvalue=%s, test_statistic=%s""" % (self.dependent_label, self.independent_label, self.pvalue, self.test_statistic)
+
+
+class PairwiseTestResult():
+
+    def __init__(self, dependent_label, independent_label, pairs, statistic, pvalue, adjusted_pvalue, degrees_of_freedom=None):
+        self.dependent_label = dependent_label
+        self.independent_label = independent_label
+        self.pairs = pairs
+        self.statistic = statistic
+        self.pvalue = pvalue
+        self.adjusted_pvalue = adjusted_pvalue
+        self.degrees_of_freedom = degrees_of_freedom
+
+    @property
+    def test_statistic(self):
+        return self.statistic
+
+    def significant(self, threshold):
+        """ Return the pairs whose adjusted pvalue falls under threshold """
+        return [pair for pair, pvalue in zip(self.pairs, self.adjusted_pvalue) if pvalue < threshold]
+
+    def to_frame(self):
+        data = {"category_1": [pair[0] for pair in self.pairs],
+                "category_2": [pair[1] for pair in self.pairs],
+                "test_statistic": self.statistic,
+                "pvalue": self.pvalue,
+                "adjusted_pvalue": self.adjusted_pvalue}
+        columns = ["category_1", "category_2", "test_statistic", "pvalue", "adjusted_pvalue"]
+        if self.degrees_of_freedom is not None:
+            data["degrees_of_freedom"] = self.degrees_of_freedom
+            columns.append("degrees_of_freedom")
+        return pd.DataFrame(data, columns=columns)
+
+    def __str__(self):
+        return """Pairwise Test:
+Dependent: %s
+Independent: %s
+Result: pairs=%s significant_at_0.05=%s""" % (self.dependent_label, self.independent_label, len(self.pairs), len(self.significant(0.05)))
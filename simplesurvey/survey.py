@@ -1,9 +1,21 @@
+import copy
+import glob
 import yaml
 import requests
 import numpy as np
 import pandas as pd
-
-from simplesurvey.stats import Chi2Test
+import scipy.sparse as sparse
+
+from simplesurvey.stats import Chi2Test, PairwiseChi2Test, RaoScottChi2Test
+from simplesurvey.results import ResultTable
+from simplesurvey.bootstrap import Bootstrap
+from simplesurvey.weighting import Raking
+from simplesurvey.index import SegmentIndex, Segment
+from simplesurvey.keys import NaturalKeyIndex
+from simplesurvey.correlation import CorrelationMatrix, dummies
+from simplesurvey.reliability import Reliability
+from simplesurvey import mapreduce
+from simplesurvey import utilities
 from itertools import product, combinations
 
 
@@ -15,8 +27,14 @@ class DuplicateColumnException(Exception):
     pass
 
 
+class FrozenSurveyException(Exception):
+    pass
+
+
 class Column():
 
+    frozen = False
+
     def __init__(self, text, column=None, description=None, calculated=None):
         if column is None:
             self._column = text
@@ -37,9 +55,20 @@ class Column():
 
     @property
     def data(self):
-        self.transform()
-        self.filter()
-        return self._data.copy()
+        if self.frozen:
+            return utilities.shared_view(self._data)
+        return self.filter(self.transform()).copy()
+
+    def freeze(self):
+        """ Copy of the column over read-only processed data. Reads of a frozen column return
+        a new series over the shared values without copying or re-applying transforms and
+        filters """
+        column = copy.copy(self)
+        column._data = utilities.read_only(self.data)
+        column._transforms = ()
+        column._filters = ()
+        column.frozen = True
+        return column
 
     @property
     def filters(self):
@@ -47,23 +76,35 @@ class Column():
 
     def add_transform(self, func):
         """ Append a transform func to the list of transform funcs """
+        if self.frozen:
+            raise FrozenSurveyException("Can't add transforms to a frozen column")
         self._transforms.append(func)
         return self
 
-    def transform(self):
-        """ tranform applies a map of the list of stored transforms to the data """
+    def transform(self, series=None):
+        """ tranform applies a map of the list of stored transforms to the data, returning the
+        transformed series and leaving the loaded data untouched """
+        if series is None:
+            series = self._data
         for func in self._transforms:
-            self._data = self._data.map(func)
+            series = series.map(func)
+        return series
 
     def add_filter(self, func):
         """ Append filter func to the list of filter funcs. """
+        if self.frozen:
+            raise FrozenSurveyException("Can't add filters to a frozen column")
         self._filters.append(func)
         return self
 
-    def filter(self):
-        """ Filter applies filters funcs to data."""
+    def filter(self, series=None):
+        """ Filter applies filters funcs to data, returning the filtered series and leaving the
+        loaded data untouched """
+        if series is None:
+            series = self._data
         for func in self._filters:
-            self._data = self._data.loc[func]
+            series = series.loc[func]
+        return series
 
     def is_loaded(self):
         if isinstance(self._data, pd.Series) and not self._data.empty:
@@ -71,22 +112,41 @@ class Column():
         return False
 
     def load(self, series):
+        if self.frozen:
+            raise FrozenSurveyException("Can't load data into a frozen column")
+        self._data = series
+
+    def restore(self, series):
+        """ Load already processed data, dropping transforms and filters already applied """
+        if self.frozen:
+            raise FrozenSurveyException("Can't restore data into a frozen column")
+        self._transforms = []
+        self._filters = []
         self._data = series
 
 
 class Question(Column):
 
-    def __init__(self, text, description=None, column=None, scale=None, breakdown_by=False):
+    def __init__(self, text, description=None, column=None, scale=None, breakdown_by=False, construct=None):
         super().__init__(text, column=column, description=description)
         self.scale = scale
         self.breakdown_by = breakdown_by
+        self.construct = construct
 
     def describe(self, percentiles=None, include=None, exclude=None):
         if not self.is_loaded():
             return None
         return self._data.describe(percentiles=percentiles, include=include, exclude=exclude)
 
+    def top_box(self):
+        """ The highest rating on the scale, falling back to the highest observed response """
+        if self.scale:
+            return max(self.scale.ratings)
+        return self._data.max()
+
     def replace_responses(self):
+        if self.frozen:
+            raise FrozenSurveyException("Can't replace responses of a frozen column")
         if self.scale:
             self._data = self._data.replace(self.scale.scoring())
 
@@ -95,11 +155,116 @@ class Question(Column):
         self.replace_responses()
 
 
+class MultiSelectQuestion(Question):
+    """ A select all that apply question. Selections are held as a sparse respondent by option
+    matrix so memory grows with the selections made rather than respondents x options.
+    Responses can be lists of options or delimited strings. """
+
+    def __init__(self, text, options=None, description=None, column=None, delimiter=None):
+        super().__init__(text, description=description, column=column)
+        self._defined_options = list(options) if options is not None else None
+        self.options = self._defined_options
+        self.delimiter = delimiter
+        self.selections = None
+        self.index = None
+
+    @property
+    def data(self):
+        """ Selections decoded back to a tuple of options per respondent. Decoded on each
+        read, even when frozen """
+        options = np.asarray(self.options, dtype=object)
+        chosen = np.split(options[self.selections.indices], self.selections.indptr[1:-1])
+        return pd.Series([tuple(row) for row in chosen], index=self.index, name=self.column)
+
+    def is_loaded(self):
+        return self.selections is not None
+
+    def describe(self, percentiles=None, include=None, exclude=None):
+        if not self.is_loaded():
+            return None
+        return self.frequencies()
+
+    def load(self, series):
+        if self.frozen:
+            raise FrozenSurveyException("Can't load data into a frozen column")
+        self._data = series
+        self.selections, self.index, self.options = self._encode(self.filter(self.transform()))
+        self._data = None
+
+    def restore(self, series):
+        if self.frozen:
+            raise FrozenSurveyException("Can't restore data into a frozen column")
+        self._transforms = []
+        self._filters = []
+        # Restored data is already decoded to tuples of options so it isn't split again
+        self.selections, self.index, self.options = self._encode(series, split=False)
+
+    def freeze(self):
+        column = copy.copy(self)
+        selections = self.selections.copy()
+        for values in (selections.data, selections.indices, selections.indptr):
+            values.setflags(write=False)
+        column.selections = selections
+        column.options = tuple(self.options)
+        column._transforms = ()
+        column._filters = ()
+        column.frozen = True
+        return column
+
+    def _encode(self, series, split=True):
+        split = split and self.delimiter is not None
+        responses = series.reset_index(drop=True)
+        if split:
+            responses = responses.str.split(self.delimiter)
+
+        selected = responses.explode().dropna()
+        if split:
+            selected = selected.str.strip()
+
+        # Options not given in the definition are inferred afresh on every load
+        options = self._defined_options
+        if options is None:
+            options = sorted(selected.unique())
+        codes = pd.Index(options).get_indexer(selected)
+        known = codes >= 0
+
+        rows = selected.index.values[known]
+        matrix = sparse.csr_matrix((np.ones(known.sum(), dtype=np.int32), (rows, codes[known])),
+                                   shape=(len(responses), len(options)))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix, series.index, options
+
+    def frequencies(self, normalize=False):
+        """ Number (or share of respondents) selecting each option """
+        counts = np.asarray(self.selections.sum(axis=0)).ravel()
+        result = pd.Series(counts, index=self.options, name=self.column)
+        if normalize:
+            return result / self.selections.shape[0]
+        return result
+
+    def cooccurrence(self):
+        """ Option by option counts of respondents selecting both """
+        matrix = (self.selections.T * self.selections).toarray()
+        return pd.DataFrame(matrix, index=self.options, columns=self.options)
+
+    def breakdown(self, dimension):
+        """ Option counts per category of a dimension """
+        codes, categories = utilities.encode(dimension.data.reindex(self.index))
+        respondents = np.flatnonzero(codes >= 0)
+        segments = sparse.csr_matrix((np.ones(len(respondents), dtype=np.int32), (respondents, codes[respondents])),
+                                     shape=(len(codes), len(categories)))
+        matrix = (segments.T * self.selections).toarray()
+        return pd.DataFrame(matrix,
+                            index=pd.Index(categories, name=dimension.column),
+                            columns=self.options)
+
+
 class Dimension(Column):
 
     def __init__(self, text, description=None, column=None, calculated=None, breakdown_by=None):
         super().__init__(text, description=description, column=column, calculated=calculated)
-        if breakdown_by is None:
+        if not breakdown_by:
             breakdown_by = Chi2Test
         self.breakdown_by = breakdown_by
 
@@ -109,14 +274,45 @@ class Dimension(Column):
     def pairwise_categories(self):
         return list(combinations(self.categories(), 2))
 
-    def breakdown_with(self, question):
-        return self.breakdown_by().test(self, question)
+    def breakdown_test(self, weights=None):
+        """ The test to break questions down with. Given survey weights the chi-square test is
+        replaced by the Rao-Scott corrected test on the weighted counts """
+        if self.breakdown_by in (Chi2Test, RaoScottChi2Test) and weights is not None:
+            return RaoScottChi2Test(weights)
+        if self.breakdown_by is RaoScottChi2Test:
+            raise ValueError("RaoScottChi2Test needs survey weights, call rake() first")
+        return self.breakdown_by()
+
+    def breakdown_with(self, question, cache=None, weights=None):
+        test = self.breakdown_test(weights)
+        if cache is not None:
+            return cache.fetch(test, self, question)
+        return test.test(self, question)
+
+    def breakdown_statistics(self, question, cache=None, weights=None):
+        """ (test name, statistic, pvalue, degrees of freedom) of the breakdown test, without
+        a result object """
+        test = self.breakdown_test(weights)
+        if cache is not None:
+            return (type(test).__name__,) + tuple(cache.fetch(test, self, question, method="statistics"))
+        return (type(test).__name__,) + tuple(test.statistics(self, question))
+
+    def posthoc(self, question, test=None, threshold=None):
+        """ Run pairwise post-hoc tests between every pair of categories. When a threshold
+        is given the omnibus breakdown is run first and None returned if it isn't significant """
+        if threshold is not None and self.breakdown_with(question).pvalue >= threshold:
+            return None
+
+        if test is None:
+            test = PairwiseChi2Test()
+        return test.test(self, question)
 
 
 class Summarizer():
 
-    def __init__(self, data):
+    def __init__(self, data, weights=None):
         self.data = data
+        self.weights = weights
         self.summary_rows = []
         self.summary_cols = []
 
@@ -126,6 +322,14 @@ class Summarizer():
     def median(self, title="Median", **kwargs):
         return self.summary(np.median, title, **kwargs)
 
+    def weighted_average(self, title="Weighted Average"):
+        return self.summary(lambda values: utilities.weighted_mean(values, self.weights), title)
+
+    def weighted_quantile(self, q, title=None):
+        if title is None:
+            title = "Weighted %s Percentile" % utilities.to_ordinal(int(q * 100))
+        return self.summary(lambda values: utilities.weighted_quantile(values, self.weights, q), title)
+
     def summary(self, func, title, axis=0, **kwargs):
         return self.multi_summary([func], [title], axis, **kwargs)
 
@@ -175,41 +379,134 @@ class Survey():
             summarizer = Summarizer
 
         self._responses = None
+        self._natural_key = None
+        self._partitions = None
+        self._partition_options = {}
         self._supplementary_data = []
         self.columns = {}
         self.processed = False
         self.summarizer = summarizer
+        self.weights = None
+        self.segment_index = None
+        self.cache = None
 
     def summarize(self, cols):
         data = self.slice(cols)
-        return self.summarizer(data)
+        if self.weights is None:
+            return self.summarizer(data)
+        return self.summarizer(data, weights=self.weights)
 
-    def crosstab(self, ind, dep, **kwargs):
+    def rake(self, margins, raking=None):
+        """ Compute respondent weights matching {dimension: {category: proportion}} target
+        margins. Weights are stored on the survey and used by weighted crosstabs and summaries """
+        if raking is None:
+            raking = Raking()
+
+        self.weights = raking.rake(self.slice(list(margins.keys())), margins)
+        return self
+
+    def crosstab(self, ind, dep, weighted=False, **kwargs):
         independent = self.columns[ind]
         dependent = self.columns[dep]
 
+        if weighted:
+            if self.weights is None:
+                raise ValueError("Survey has no weights, call rake() first")
+            kwargs.update(values=self.weights, aggfunc="sum")
+
         data = pd.crosstab(independent.data, dependent.data, **kwargs)
-        if dependent.scale:
-            data = data[dependent.ratings]
+        if getattr(dependent, "scale", None):
+            data = data.reindex(columns=dependent.scale.ratings, fill_value=0)
 
         return data
 
-    def responses(self, path, natural_key=None, header=0):
-        if isinstance(path, pd.DataFrame):
-            self._responses = path
-        else:
-            self._load_responses_into_dataframe(path, natural_key=natural_key, header=header)
+    def confidence_intervals(self, question, dimension, top_box=None, bootstrap=None):
+        """ Bootstrap confidence intervals for the mean and top box percentage of a question
+        for every segment of a dimension """
+        if not self.processed:
+            self.process()
+
+        if bootstrap is None:
+            bootstrap = Bootstrap()
+
+        question = self.columns[question]
+        if top_box is None:
+            top_box = question.top_box()
+
+        return bootstrap.segment_intervals(question.data, self.columns[dimension].data, top_box)
+
+    def correlations(self, method="spearman", dimensions=False, engine=None):
+        """ Correlation matrix across every scaled question, optionally including dimensions
+        as 0/1 dummy columns per category """
+        if engine is None:
+            engine = CorrelationMatrix(method=method)
+
+        columns = [question.column for question in self.questions if question.scale and not isinstance(question, MultiSelectQuestion)]
+        data = self.slice(columns)
+        if dimensions:
+            dimension_data = self.slice([dimension.column for dimension in self.dimensions])
+            data = pd.concat([data] + [dummies(dimension_data[column]) for column in dimension_data.columns], axis=1)
+
+        return engine.compute(data)
+
+    def reliability(self, dimension=None):
+        """ Cronbach's alpha, alpha if item deleted and item-total correlations for every
+        construct, optionally for every segment of a dimension """
+        return Reliability(self).analyse(dimension)
+
+    def responses(self, path, natural_key=None, header=0, duplicates="latest", order_by=None):
+        """ Set the response data. With a natural key, duplicate responses are resolved by
+        the duplicates policy (latest, first or error) optionally ordered by order_by.
+
+        A glob or list of paths/dataframes registers response partitions instead which
+        aggregate() processes independently; duplicates are resolved across partitions """
+        if isinstance(path, (list, tuple)) or (isinstance(path, str) and glob.has_magic(path)):
+            self._partitions = sorted(glob.glob(path)) if isinstance(path, str) else list(path)
+            if not self._partitions:
+                raise SurveyLoadingException("No response partitions match %s" % (path,))
+            self._partition_options = dict(natural_key=natural_key, header=header, duplicates=duplicates, order_by=order_by)
+            self._responses = None
+            return self
+
+        self._partitions = None
+        data = path
+        if not isinstance(data, pd.DataFrame):
+            data = self._load(path, header=header)
 
+        self._set_responses(data, natural_key, duplicates, order_by)
         return self
 
-    def _load_responses_into_dataframe(self, path, natural_key=None, header=0):
-        self._responses = self._load(path, header=header)
+    def _read_partition(self, partition):
+        if isinstance(partition, pd.DataFrame):
+            return partition
+        return self._load(partition, header=self._partition_options["header"])
+
+    def _load_partition(self, data):
+        options = self._partition_options
+        self._set_responses(data, options["natural_key"], options["duplicates"], options["order_by"])
+
+    def aggregate(self, processes=None):
+        """ Process every response partition in parallel and reduce them into Aggregates
+        without holding the full dataset in one process """
+        if not self._partitions:
+            raise SurveyLoadingException("aggregate requires responses given as a glob or list of partitions")
+        return mapreduce.aggregate(self, processes=processes)
 
+    def _set_responses(self, data, natural_key=None, duplicates="latest", order_by=None):
+        self._natural_key = natural_key
         if natural_key is not None:
-            self._responses = self._responses.set_index(natural_key)
-        return self
+            data = self._resolve_duplicates(data, natural_key, duplicates, order_by)
+            data = data.set_index(natural_key)
+        self._responses = data
+
+    def _resolve_duplicates(self, data, natural_key, duplicates, order_by):
+        order = None if order_by is None else data[order_by].values
+        index = NaturalKeyIndex(data[natural_key].values, duplicates=duplicates, order=order)
+        if index.duplicates:
+            data = data.iloc[index.keep()]
+        return data
 
-    def supplementary_data(self, path_or_dataframe, natural_key=None, header=0):
+    def supplementary_data(self, path_or_dataframe, natural_key=None, header=0, duplicates="latest", order_by=None):
         if natural_key is None:
             raise Exception("Must supply natural key if joining supplmentary data to responses")
 
@@ -218,9 +515,10 @@ class Survey():
         if not isinstance(data, pd.DataFrame):
             data = self._load(data, header=header)
 
-        data = data.set_index(natural_key)
+        order = None if order_by is None else data[order_by].values
+        index = NaturalKeyIndex(data[natural_key].values, duplicates=duplicates, order=order)
 
-        self._supplementary_data.append(data)
+        self._supplementary_data.append((data.drop(natural_key, axis=1), index))
         return self
 
     @property
@@ -260,22 +558,64 @@ class Survey():
         columns = [col.data for name, col in self.columns.items() if name in columns]
         return pd.concat(columns, axis=1, ignore_index=False)
 
+    def build_index(self):
+        """ Build the bitmap segment index over the processed data """
+        self.segment_index = SegmentIndex(self.data, [dimension.column for dimension in self.dimensions])
+        return self
+
+    def segment(self, **criteria):
+        """ Select respondents matching every criteria. Each criteria maps a dimension to a
+        category or list of categories, e.g. segment(team="eng", office=["ottawa", "toronto"]) """
+        if self.segment_index is None:
+            self.build_index()
+        return Segment(self, self.segment_index.select(**criteria))
+
     def process(self):
+        self.segment_index = None
+        self._format_data(self._join())
+        self.processed = True
+
+    def freeze(self, build_index=False):
+        """ Immutable snapshot of the processed survey that many threads can query at once """
+        if not self.processed:
+            self.process()
+        return SurveySnapshot(self, build_index=build_index)
+
+    def _join(self):
+        if self._partitions:
+            self._load_partition(pd.concat([self._read_partition(partition) for partition in self._partitions], ignore_index=True))
+
         merged_data = self._responses.copy()
 
-        if all(merged_data.index.values == [0]) and len(self._supplementary_data) > 0:
+        # Frames passed in already indexed by their key are joined on that index
+        if self._natural_key is None and isinstance(merged_data.index, pd.RangeIndex) and len(self._supplementary_data) > 0:
             raise SurveyLoadingException("Responses are being joined with out specified natural key")
 
-        for data in self._supplementary_data:
-            try:
-                merged_data = pd.merge(merged_data, data, suffixes=('', ''), left_index=True, right_index=True, how="left")
-            except ValueError as e:
-                if str(e).startswith("columns overlap"):
-                    raise SurveyLoadingException("No overlapping columns in supplementary data")
-                raise e
+        keys = merged_data.index.values
+        for data, index in self._supplementary_data:
+            overlap = merged_data.columns.intersection(data.columns)
+            if len(overlap):
+                raise SurveyLoadingException("Supplementary data has columns overlapping responses %s" % list(overlap))
+
+            joined = index.take(data, keys)
+            for column in joined.columns:
+                merged_data[column] = joined[column].values
 
-        self._format_data(merged_data)
+        return merged_data
+
+    def processed_columns(self):
+        """ Processed data of every column keyed by column name """
+        if not self.processed:
+            self.process()
+        return {name: column.data for name, column in self.columns.items()}
+
+    def restore(self, columns):
+        """ Load column data returned by processed_columns without processing it again """
+        for name, series in columns.items():
+            self.columns[name].restore(series)
+        self.segment_index = None
         self.processed = True
+        return self
 
     def _concat(self, cols):
         return pd.concat(cols, axis=1, ignore_index=False)
@@ -297,7 +637,6 @@ class Survey():
     def _load_data(self, data):
         for _, entry in self.columns.items():
             entry.load(data[entry.column])
-            data.drop(entry.column, 1)
 
     def _create_calculated_columns(self, data):
         # TODO:: Find better way of doing this. Perhaps separate list for calculated columns
@@ -332,17 +671,65 @@ class Survey():
         return loader(path, header=header)
 
     def _filter_questions_for_breakdown(self):
-        return [question for _, question in self.columns.items() if isinstance(question, Question) and question.breakdown]
+        return [question for _, question in self.columns.items() if isinstance(question, Question) and question.breakdown_by]
+
+    def breakdown_by_dimensions(self, threshold=None, correction=None, cache=None):
+        """ Test every breakdown question against every dimension and collect the results
+        into a ResultTable. Optionally correct for multiple comparisons and keep only the
+        results under threshold. Results are looked up in cache (or the survey cache) first """
+        if not self.processed:
+            self.process()
+
+        return self._breakdown(self._filter_questions_for_breakdown(), self.dimensions, threshold, correction, cache)
+
+    def _breakdown(self, questions, dimensions, threshold=None, correction=None, cache=None):
+        if cache is None:
+            cache = self.cache
+
+        table = ResultTable.allocate(len(questions) * len(dimensions))
+        pairs = ((question, dimension) for question in questions for dimension in dimensions)
+        for row, (question, dimension) in enumerate(pairs):
+            test, statistic, pvalue, dof = dimension.breakdown_statistics(question, cache=cache, weights=self.weights)
+            table.record(row, test, question.text, dimension.text, statistic, pvalue, dof)
 
-    def breakdown_by_dimensions(self, threshold):
-        """ {"question1": [Result1, Result2]}"""
-        breakdown = {}
-        for question in self._filter_questions_for_breakdown():
-            results = []
-            for dimension in self.dimensions():
-                results.append(dimension.breakdown_with(question))
-            breakdown[question.column] = results
-        return breakdown
+        if correction is not None:
+            table.adjust(correction)
+        if threshold is not None:
+            table = table.significant(threshold)
+        return table
+
+
+class SurveySnapshot(Survey):
+    """ A frozen processed survey. Column data is read-only and shared between readers,
+    reads never mutate state and every method that would change the survey raises
+    FrozenSurveyException. Built with Survey.freeze() """
+
+    def __init__(self, survey, build_index=False):
+        super().__init__(survey.summarizer)
+        self.columns = {name: column.freeze() for name, column in survey.columns.items()}
+        self.weights = None if survey.weights is None else utilities.read_only(survey.weights)
+        self.cache = survey.cache
+        self._natural_key = survey._natural_key
+        self.processed = True
+
+        if build_index or survey.segment_index is not None:
+            self.segment_index = SegmentIndex(self.data, [dimension.column for dimension in self.dimensions])
+
+    def segment(self, **criteria):
+        if self.segment_index is None:
+            raise FrozenSurveyException("Segment index must be built when freezing, use freeze(build_index=True)")
+        return super().segment(**criteria)
+
+    def _frozen(self, *args, **kwargs):
+        raise FrozenSurveyException("Survey snapshots are read only")
+
+    responses = supplementary_data = add_column = add_columns = _frozen
+    process = restore = rake = build_index = _frozen
+
+    def freeze(self, build_index=False):
+        if build_index and self.segment_index is None:
+            raise FrozenSurveyException("Segment index must be built when freezing, use freeze(build_index=True)")
+        return self
 
 
 class TypeFormSurvey(Survey):
@@ -368,31 +755,34 @@ class TypeFormSurvey(Survey):
             raise "Encountered an error while trying to download from TypeForm: {}".format(response.status_code)
         return response
 
-    def fetch(self, index=None, transform=None):
+    def fetch(self, index=None, transform=None, duplicates="latest"):
         """ Download data for a form and convert to a data frame. We can specify
         the key to use as the index including any tranform we require to get it in a
         shape to use as an index. This requires you know the shape of the data when
         passing in the key transform func"""
         data = self.fetch_data()
 
-        responses = [x for x in data.json()['responses'] if x['completed'] == '1']
-        questions = {x['id']: x['question'] for x in data.json()['questions']}
+        responses = [x['answers'] for x in data.json()['responses'] if x['completed'] == '1']
 
-        data = dict((el, []) for el in questions.keys())
-        for r in responses:
-            r = r['answers']
+        # Multi select answers arrive as one id per choice sharing a field id
+        fields = {}
+        for question in data.json()['questions']:
+            fields.setdefault(question.get('field_id', question['id']), []).append(question)
 
-            for key in data.keys():
-                data[key].append(r.get(key, pd.NaT))
+        data = {}
+        for group in fields.values():
+            ids = [question['id'] for question in group]
+            if len(ids) == 1:
+                data[group[0]['question']] = [r.get(ids[0], pd.NaT) for r in responses]
+            else:
+                data[group[0]['question']] = [[r[key] for key in ids if r.get(key)] for r in responses]
 
-        self._responses = pd.DataFrame(data).rename(columns=questions)
+        responses = pd.DataFrame(data)
 
         if transform:
-            self._responses[index] = self._responses[index].map(transform)
-
-        if index:
-            self._responses = self._responses.set_index(index)
+            responses[index] = responses[index].map(transform)
 
+        self._set_responses(responses, natural_key=index, duplicates=duplicates)
         return self
 
 # NOTE:: Lets dry this up so we don't have a bunch of these
@@ -415,24 +805,27 @@ def survey_yaml_constructor(loader, node):
     return survey
 
 
+def _add_functions(column, values):
+    # NOTE:: Note to future self - eval is the devil
+    for func_st in values.get("filters") or []:
+        column.add_filter(eval(func_st))
+
+    for func_st in values.get("transforms") or []:
+        column.add_transform(eval(func_st))
+
+    return column
+
+
 def question_yaml_constructor(loader, node):
     values = loader.construct_mapping(node)
     question = Question(values.get("text"),
                         description=values.get("description"),
                         column=values.get("column"),
                         scale=values.get("scale"),
-                        breakdown_by=values.get("breakdown_by", False))
+                        breakdown_by=values.get("breakdown_by", False),
+                        construct=values.get("construct"))
 
-    # NOTE:: Note to future self - eval is the devil
-    if values.get("filters"):
-        for func_st in values.get("filters"):
-            question.add_filter(eval(func_st))
-
-    if values.get("transforms"):
-        for func_st in values.get("transforms"):
-            question.add_transform(eval(func_st))
-
-    return question
+    return _add_functions(question, values)
 
 
 def dimension_yaml_constructor(loader, node):
@@ -443,18 +836,21 @@ def dimension_yaml_constructor(loader, node):
                           calculated=values.get("calculated"),
                           breakdown_by=values.get("breakdown_by", False))
 
-    # NOTE:: Note to future self - eval is the devil
-    if values.get("filters"):
-        for func_st in values.get("filters"):
-            dimension.add_filter(eval(func_st))
+    return _add_functions(dimension, values)
 
-    if values.get("transforms"):
-        for func_st in values.get("transforms"):
-            dimension.add_transform(eval(func_st))
 
-    return dimension
+def multi_select_question_yaml_constructor(loader, node):
+    values = loader.construct_mapping(node, deep=True)
+    question = MultiSelectQuestion(values.get("text"),
+                                   options=values.get("options"),
+                                   description=values.get("description"),
+                                   column=values.get("column"),
+                                   delimiter=values.get("delimiter"))
+
+    return _add_functions(question, values)
 
 yaml.add_constructor("!TypeFormSurvey", typeform_survey_yaml_constructor)
 yaml.add_constructor("!Survey", survey_yaml_constructor)
 yaml.add_constructor("!Question", question_yaml_constructor)
 yaml.add_constructor("!Dimension", dimension_yaml_constructor)
+yaml.add_constructor("!MultiSelectQuestion", multi_select_question_yaml_constructor)
@@ -1,6 +1,11 @@
 import math
+import itertools
+import numpy as np
 import pandas as pd
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 
 def contingency_table(x, y, **kwargs):
     return pd.crosstab(x, y, **kwargs)
@@ -26,3 +31,82 @@ def column_group_sizes(data, column):
                .rename("%s_size" % column) \
                .to_frame()\
                .reset_index()
+
+
+def encode(series, sort=True):
+    """ Integer code a series returning (codes, categories). Missing values are coded -1 """
+    codes, categories = pd.factorize(series, sort=sort)
+    return codes, categories
+
+
+def aligned_codes(x, y):
+    """ Align two series on their index, drop missing pairs and integer code both sides.
+    Returns (x_codes, x_categories, y_codes, y_categories) """
+    data = pd.concat([x, y], axis=1, join="inner").dropna()
+    x_codes, x_categories = encode(data.iloc[:, 0])
+    y_codes, y_categories = encode(data.iloc[:, 1])
+    return x_codes, x_categories, y_codes, y_categories
+
+
+def weighted_mean(values, weights):
+    """ Mean of values weighted by the weights aligned on the values index """
+    data = pd.concat([values, weights.reindex(values.index)], axis=1).dropna()
+    return (data.iloc[:, 0] * data.iloc[:, 1]).sum() / data.iloc[:, 1].sum()
+
+
+def weighted_quantile(values, weights, q):
+    """ Quantile of values weighted by the weights aligned on the values index """
+    data = pd.concat([values, weights.reindex(values.index)], axis=1).dropna()
+    data = data.sort_values(data.columns[0])
+    w = data.iloc[:, 1].values.astype(float)
+    cumulative = (w.cumsum() - 0.5 * w) / w.sum()
+    return np.interp(q, cumulative, data.iloc[:, 0].values.astype(float))
+
+
+def read_only(series):
+    """ Copy of a series whose numpy backed values can't be written to """
+    values = series.values
+    if not isinstance(values, np.ndarray):
+        return series.copy()
+    values = values.copy()
+    values.setflags(write=False)
+    return pd.Series(values, index=series.index, name=series.name, copy=False)
+
+
+def shared_view(series):
+    """ New series over the read-only values of series without copying them, so readers can
+    neither write into nor rename the shared series. Writable values are copied """
+    values = series.values
+    if not isinstance(values, np.ndarray) or values.flags.writeable:
+        return series.copy()
+    return pd.Series(values, index=series.index, name=series.name, copy=False)
+
+
+def blocks(total, width, block_size, seed=None):
+    """ Split total draws of width elements each into blocks of at most block_size elements.
+    Returns (count, seed) per block, with block seeds derived from seed so results are
+    reproducible for a given seed and block_size """
+    per_block = max(1, block_size // max(width, 1))
+    counts = [per_block] * (total // per_block)
+    if total % per_block:
+        counts.append(total % per_block)
+
+    seeds = np.random.RandomState(seed).randint(0, 2 ** 31 - 1, size=len(counts))
+    return list(zip(counts, seeds))
+
+
+def parallel_map(func, tasks, processes=None):
+    """ Lazily map func over tasks in order, in a process pool when processes > 1. At most
+    processes tasks run ahead of the consumer so closing the iterator stops new work """
+    if processes is None or processes <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(processes) as executor:
+        pending = deque(executor.submit(func, task) for task in itertools.islice(tasks, processes))
+        while pending:
+            result = pending.popleft().result()
+            pending.extend(executor.submit(func, task) for task in itertools.islice(tasks, 1))
+            yield result
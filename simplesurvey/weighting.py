@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+
+class RakingException(Exception):
+    pass
+
+
+class Raking():
+    """ Iterative proportional fitting of respondent weights to target margins. Each margin
+    is an integer coded column; a pass adjusts the weights of every margin in turn with one
+    bincount per margin until all weighted margins are within tolerance of their targets. """
+
+    def __init__(self, max_iterations=100, tolerance=1e-6):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.iterations = 0
+
+    def fit(self, codes, targets, base_weights=None):
+        """ codes is a list of integer arrays (-1 for missing) and targets a list of arrays of
+        target proportions per category. Returns weights normalized to a mean of one """
+        n = len(codes[0])
+        weights = np.ones(n) if base_weights is None else np.asarray(base_weights, dtype=float).copy()
+
+        # Respondents missing a margin are coded into an extra category whose factor stays 1
+        margins = []
+        for code, target in zip(codes, targets):
+            target = np.asarray(target, dtype=float)
+            code = np.where(code < 0, len(target), code)
+            margins.append((code, target / target.sum(), len(target)))
+
+        for iteration in range(1, self.max_iterations + 1):
+            self.iterations = iteration
+            for code, target, size in margins:
+                totals = np.bincount(code, weights=weights, minlength=size + 1)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    factors = np.where(totals[:size] > 0, target * totals[:size].sum() / totals[:size], 1.0)
+                weights *= np.append(factors, 1.0)[code]
+
+            if self._error(margins, weights) < self.tolerance:
+                return weights * n / weights.sum()
+
+        raise RakingException("Raking failed to converge after %s iterations" % self.max_iterations)
+
+    def _error(self, margins, weights):
+        error = 0.0
+        for code, target, size in margins:
+            totals = np.bincount(code, weights=weights, minlength=size + 1)[:size]
+            error = max(error, np.abs(totals / totals.sum() - target).max())
+        return error
+
+    def rake(self, data, margins):
+        """ Compute weights for a dataframe given {column: {category: proportion}} margins """
+        codes, targets = [], []
+        for column, margin in margins.items():
+            categories = list(margin.keys())
+            codes.append(pd.Categorical(data[column], categories=categories).codes.astype(np.int64))
+            targets.append([margin[category] for category in categories])
+
+        return pd.Series(self.fit(codes, targets), index=data.index, name="weight")
@@ -0,0 +1,12 @@
+import pytest
+import simplesurvey
+
+
+@pytest.fixture
+def make_survey():
+    """ Build a survey over a DataFrame of responses with the given columns """
+    def make(data, *columns):
+        survey = simplesurvey.Survey()
+        survey.responses(data).add_columns(columns)
+        return survey
+    return make
@@ -0,0 +1,38 @@
+import pytest
+import numpy as np
+import pandas as pd
+import simplesurvey
+
+from simplesurvey.bootstrap import Bootstrap
+
+
+@pytest.fixture
+def survey(make_survey):
+    rng = np.random.RandomState(2)
+    data = pd.DataFrame({"team": np.repeat(["a", "b"], 200),
+                         "score": np.concatenate([rng.randint(1, 4, 200), rng.randint(3, 6, 200)])})
+    return make_survey(data, simplesurvey.Dimension("team"), simplesurvey.Question("score"))
+
+
+def test_confidence_intervals_cover_segment_means(survey):
+    result = survey.confidence_intervals("score", "team", bootstrap=Bootstrap(resamples=200, seed=1))
+
+    assert list(result.index) == ["a", "b"]
+    assert list(result["count"]) == [200, 200]
+    assert (result["mean_lower"] <= result["mean"]).all()
+    assert (result["mean"] <= result["mean_upper"]).all()
+    assert result.loc["a", "mean_upper"] < result.loc["b", "mean_lower"]
+    assert result.loc["a", "top_box"] == 0
+
+
+def test_bootstrap_is_deterministic_across_processes():
+    rng = np.random.RandomState(3)
+    values = rng.randint(1, 6, 500)
+    segments = rng.randint(0, 4, 500)
+
+    serial = Bootstrap(resamples=50, block_size=5000, seed=7)
+    parallel = Bootstrap(resamples=50, block_size=5000, seed=7, processes=2)
+
+    for expected, result in zip(serial.resample(values, segments, 5), parallel.resample(values, segments, 5)):
+        assert expected.shape == (50, 4)
+        assert np.array_equal(expected, result)
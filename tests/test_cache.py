@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+import pandas as pd
+import simplesurvey
+
+from simplesurvey.cache import ResultCache
+from simplesurvey.stats import Chi2Test
+
+
+@pytest.fixture
+def cached_survey(make_survey):
+    def make(noise_seed=1):
+        rng = np.random.RandomState(noise_seed)
+        data = pd.DataFrame({"team": np.repeat(["eng", "ops"], 50),
+                             "score": np.tile([1, 2, 3, 4, 5], 20),
+                             "noise": rng.randint(1, 4, 100)})
+        return make_survey(data,
+                           simplesurvey.Dimension("team"),
+                           simplesurvey.Question("score", breakdown_by=True),
+                           simplesurvey.Question("noise", breakdown_by=True))
+    return make
+
+
+def test_breakdown_reuses_results_for_unchanged_columns(tmpdir, cached_survey):
+    cache = ResultCache(str(tmpdir))
+    first = cached_survey().breakdown_by_dimensions(cache=cache)
+    assert cache.stats()["misses"] == 2
+
+    rerun = ResultCache(str(tmpdir))
+    second = cached_survey(noise_seed=2).breakdown_by_dimensions(cache=rerun)
+    assert (rerun.hits, rerun.misses) == (1, 1)
+    assert rerun.hit_rate == 0.5
+    assert second.pvalue[list(second.dependent).index("score")] == first.pvalue[list(first.dependent).index("score")]
+
+
+def test_cache_key_includes_test_parameters(cached_survey):
+    survey = cached_survey()
+    survey.process()
+    team, score = survey.columns["team"], survey.columns["score"]
+
+    cache = ResultCache()
+    assert cache.key(Chi2Test(), team, score) == cache.key(Chi2Test(), team, score)
+    assert cache.key(Chi2Test(), team, score) != cache.key(Chi2Test(), team, survey.columns["noise"])
+    assert cache.key(simplesurvey.PairwiseChi2Test(correction="holm"), team, score) != \
+        cache.key(simplesurvey.PairwiseChi2Test(correction="fdr_bh"), team, score)
+
+
+def test_cache_evicts_least_recently_used(tmpdir):
+    cache = ResultCache(str(tmpdir), max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert sorted(path.basename for path in tmpdir.listdir()) == ["a.pkl", "c.pkl"]
+    assert ResultCache(str(tmpdir)).get("a") == 1
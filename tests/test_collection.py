@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from simplesurvey.collection import SurveyCollection
+
+DEFINITION = """
+--- !Survey
+questions:
+    - !Question
+      text: "score"
+    - !Dimension
+      text: "team"
+"""
+
+
+def wave(seed, low, high):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({"team": np.repeat(["a", "b"], 100),
+                         "score": np.concatenate([rng.randint(1, 4, 100), rng.randint(low, high, 100)])})
+
+
+def collection(processes=None):
+    return SurveyCollection(DEFINITION, processes=processes)\
+        .add_wave("2017Q1", wave(1, 1, 4))\
+        .add_wave("2017Q2", wave(2, 4, 6))\
+        .process()
+
+
+def test_collection_keys_waves_in_one_frame():
+    result = collection().data
+
+    assert len(result) == 400
+    assert list(result["wave"].cat.categories) == ["2017Q1", "2017Q2"]
+
+
+def test_collection_processes_waves_in_parallel():
+    serial, parallel = collection(), collection(processes=2)
+    assert serial.data.equals(parallel.data)
+
+
+def test_deltas_by_dimension_flag_changed_segment():
+    result = collection().deltas(dimension="team").set_index("team")
+
+    assert list(result["wave"]) == ["2017Q2", "2017Q2"]
+    assert result.loc["b", "delta"] > 2
+    assert result.loc["b", "pvalue"] < 0.001
+    assert result.loc["a", "pvalue"] > 0.001
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+import simplesurvey
+
+from simplesurvey.correlation import CorrelationMatrix
+
+
+def ordinal_data():
+    rng = np.random.RandomState(7)
+    a = rng.randint(1, 8, 500).astype(float)
+    data = pd.DataFrame({"a": a,
+                         "b": np.clip(a + rng.randint(-2, 3, 500), 1, 7),
+                         "c": rng.randint(1, 6, 500).astype(float)})
+    data.loc[:40, "b"] = np.nan
+    return data
+
+
+def test_spearman_matches_scipy_with_pairwise_missing():
+    data = ordinal_data()
+    coded = CorrelationMatrix("spearman").compute(data)
+    fallback = CorrelationMatrix("spearman", max_levels=2).compute(data)
+
+    for first, second in [("a", "b"), ("a", "c"), ("b", "c")]:
+        complete = data[[first, second]].dropna()
+        expected = stats.spearmanr(complete[first], complete[second])
+        for result in (coded, fallback):
+            assert np.isclose(result.coefficients.loc[first, second], expected[0])
+            assert np.isclose(result.pvalues.loc[first, second], expected[1])
+    assert coded.counts.loc["a", "b"] == 459
+
+
+def test_kendall_tau_b_matches_scipy_with_pairwise_missing():
+    data = ordinal_data()
+    coded = CorrelationMatrix("kendall").compute(data)
+    fallback = CorrelationMatrix("kendall", max_levels=2).compute(data)
+
+    for first, second in [("a", "b"), ("a", "c"), ("b", "c")]:
+        complete = data[[first, second]].dropna()
+        expected = stats.kendalltau(complete[first], complete[second])
+        for result in (coded, fallback):
+            assert np.isclose(result.coefficients.loc[first, second], expected[0])
+            assert np.isclose(result.pvalues.loc[first, second], expected[1])
+
+
+def test_survey_correlations_across_scaled_questions_and_dimensions():
+    scale = simplesurvey.OrdinalScale(labels=[1, 2, 3, 4, 5, 6, 7], ratings=[1, 2, 3, 4, 5, 6, 7])
+    data = ordinal_data()
+    data["team"] = np.where(data["a"] > 4, "eng", "ops")
+
+    survey = simplesurvey.Survey()
+    survey.responses(data)\
+          .add_column(simplesurvey.Question("a", scale=scale))\
+          .add_column(simplesurvey.Question("b", scale=scale))\
+          .add_column(simplesurvey.Question("c"))\
+          .add_column(simplesurvey.Dimension("team"))
+
+    result = survey.correlations(dimensions=True)
+    assert list(result.coefficients.columns) == ["a", "b", "team=eng", "team=ops"]
+    assert result.coefficients.loc["team=eng", "team=ops"] == -1
+    assert len(result.pairs()) == 6
+
+
+def test_blocked_gram_product_matches_single_block():
+    data = ordinal_data()
+    data["d"] = np.where(data["c"] > 2, data["a"], np.nan)
+
+    for method in CorrelationMatrix.methods:
+        whole = CorrelationMatrix(method).compute(data)
+        blocked = CorrelationMatrix(method, block_size=200).compute(data)
+        assert np.allclose(whole.coefficients, blocked.coefficients)
+        assert np.array_equal(whole.counts, blocked.counts)
@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+import pandas as pd
+import simplesurvey
+
+
+@pytest.fixture
+def survey(make_survey):
+    data = pd.DataFrame({"team": ["eng", "eng", "sales", "ops", "eng", "sales"],
+                         "office": ["ottawa", "toronto", "ottawa", "ottawa", "ottawa", "toronto"],
+                         "score": [1, 2, 3, 4, 5, 5]})
+    return make_survey(data,
+                       simplesurvey.Dimension("team"),
+                       simplesurvey.Dimension("office"),
+                       simplesurvey.Question("score", breakdown_by=True)).build_index()
+
+
+def test_segment_ands_dimensions_and_ors_categories(survey):
+
+    assert list(survey.segment(team="eng", office="ottawa").positions) == [0, 4]
+    assert list(survey.segment(team=["sales", "ops"]).positions) == [2, 3, 5]
+    assert len(survey.segment(team="eng") & survey.segment(office="toronto")) == 1
+    assert len(survey.segment(team="ops") | survey.segment(office="toronto")) == 3
+
+
+def test_segment_crosstab_matches_pandas(survey):
+    segment = survey.segment(office="ottawa")
+
+    result = segment.crosstab("team", "score")
+    expected = pd.crosstab(segment.data["team"], segment.data["score"])
+    assert np.array_equal(result.values, expected.values)
+    assert list(result.index) == list(expected.index)
+
+
+def test_segment_summarize_and_breakdown_use_selected_rows(survey):
+    segment = survey.segment(team="eng")
+
+    summary = segment.summarize(["score"]).average().row_summary()
+    assert summary.loc["Average", "score"] == np.mean([1, 2, 5])
+
+    result = segment.breakdown_by_dimensions()
+    assert list(result.independent) == ["team", "office"]
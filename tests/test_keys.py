@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from unittest import mock
+from simplesurvey.keys import NaturalKeyIndex, DuplicateKeyException
+
+
+def test_natural_key_index_resolves_duplicates_by_policy():
+    keys = ["a", "b", "a", "c", "a"]
+
+    assert list(NaturalKeyIndex(keys, duplicates="latest").keep()) == [1, 3, 4]
+    assert list(NaturalKeyIndex(keys, duplicates="first").keep()) == [0, 1, 3]
+    assert list(NaturalKeyIndex(keys, order=[3, 0, 9, 0, 1]).keep()) == [1, 2, 3]
+
+    with pytest.raises(DuplicateKeyException):
+        NaturalKeyIndex(keys, duplicates="error")
+
+
+def test_natural_key_index_lookup_and_take():
+    index = NaturalKeyIndex([10, 20, 30])
+    assert list(index.lookup([30, 40, 10])) == [2, -1, 0]
+
+    data = pd.DataFrame({"team": ["eng", "ops", "sales"]})
+    result = index.take(data, [30, 40, 10])
+    assert result["team"].iloc[0] == "sales"
+    assert pd.isnull(result["team"].iloc[1])
+    assert np.array_equal(result.index.values, [2, 0, 0])
+
+
+def test_natural_key_index_verifies_keys_on_hash_collisions():
+    with mock.patch("simplesurvey.keys.pd.util.hash_array", lambda keys: np.zeros(len(keys), dtype=np.uint64)):
+        index = NaturalKeyIndex(["a", "b", "c", "b"])
+        assert list(index.keep()) == [0, 2, 3]
+        assert list(index.lookup(["b", "d", "a", "c"])) == [3, -1, 0, 2]
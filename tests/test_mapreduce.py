@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+import simplesurvey
+
+
+@pytest.fixture
+def partitioned(tmpdir, make_survey):
+    rng = np.random.RandomState(9)
+    frames = []
+    for day in range(3):
+        frame = pd.DataFrame({"team": rng.choice(["eng", "ops", "sales"], 60),
+                              "score": rng.randint(1, 6, 60)})
+        frame.to_csv(str(tmpdir.join("responses-%s.csv" % day)), index=False)
+        frames.append(frame)
+
+    survey = make_survey(str(tmpdir.join("responses-*.csv")),
+                         simplesurvey.Dimension("team"),
+                         simplesurvey.Question("score", breakdown_by=True))
+    return survey, pd.concat(frames, ignore_index=True)
+
+
+def test_aggregate_reduces_partitions_to_full_results(partitioned):
+    survey, data = partitioned
+    result = survey.aggregate()
+
+    assert result.crosstab("team", "score").equals(pd.crosstab(data.team, data.score).rename_axis(index="team", columns="score"))
+    assert np.isclose(result.summary().loc["score", "mean"], data.score.mean())
+    assert np.isclose(result.summary().loc["score", "std"], data.score.std())
+    assert result.summary().loc["score", "median"] == data.score.median()
+
+    expected = stats.chi2_contingency(pd.crosstab(data.team, data.score))
+    assert np.isclose(result.breakdown(survey).pvalue[0], expected[1])
+
+
+def test_aggregate_kruskal_matches_scipy(partitioned):
+    survey, data = partitioned
+    result = survey.aggregate().kruskal("team", "score")
+
+    expected = stats.kruskal(*[group.score for _, group in data.groupby("team")])
+    assert np.isclose(result.hstatistic, expected[0])
+    assert np.isclose(result.pvalue, expected[1])
+
+
+def test_aggregate_in_worker_processes_matches_serial(partitioned):
+    survey, data = partitioned
+    survey.columns["score"].add_filter(lambda x: x > 1)
+
+    serial = survey.aggregate().crosstab("team", "score")
+    parallel = survey.aggregate(processes=2).crosstab("team", "score")
+    assert serial.equals(parallel)
+    assert list(serial.columns) == [2, 3, 4, 5]
+
+
+def test_partitioned_survey_still_processes_in_memory(partitioned):
+    survey, data = partitioned
+    survey.process()
+    assert len(survey.data) == len(data)
+
+
+def test_aggregate_resolves_natural_keys_across_partitions(tmpdir):
+    pd.DataFrame({"email": ["a", "b"], "team": ["eng", "ops"], "score": [1, 2]})\
+      .to_csv(str(tmpdir.join("day-0.csv")), index=False)
+    pd.DataFrame({"email": ["a", "c"], "team": ["eng", "ops"], "score": [5, 3]})\
+      .to_csv(str(tmpdir.join("day-1.csv")), index=False)
+
+    survey = simplesurvey.Survey()
+    survey.responses(str(tmpdir.join("day-*.csv")), natural_key="email")\
+          .add_column(simplesurvey.Dimension("team"))\
+          .add_column(simplesurvey.Question("score", breakdown_by=True))
+
+    result = survey.aggregate().counts["score"].sort_index()
+    assert result.to_dict() == {2: 1, 3: 1, 5: 1}
+    assert result.to_dict() == survey.data["score"].value_counts().sort_index().to_dict()
+
+
+def test_responses_glob_without_matches_raises(tmpdir):
+    with pytest.raises(simplesurvey.SurveyLoadingException):
+        simplesurvey.Survey().responses(str(tmpdir.join("missing-*.csv")))
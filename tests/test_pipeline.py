@@ -0,0 +1,84 @@
+import threading
+import pandas as pd
+
+from simplesurvey import cli
+from simplesurvey.pipeline import ArtifactStore, Pipeline, Stage
+
+DEFINITION = """
+--- !Survey
+questions:
+    - !Question
+      text: "score"
+      breakdown_by: true
+      transforms:
+        - |
+            lambda x: x * 10
+    - !Dimension
+      text: "team"
+"""
+
+
+def write_inputs(tmpdir, definition=DEFINITION):
+    tmpdir.join("survey.yaml").write(definition)
+    tmpdir.join("responses.csv").write("email,score\na,1\nb,2\nc,3\nd,1\n")
+    tmpdir.join("teams.csv").write("email,team\na,eng\nb,eng\nc,ops\nd,ops\n")
+
+
+def run(tmpdir, capsys):
+    cli.main([str(tmpdir.join("survey.yaml")),
+              "--responses", str(tmpdir.join("responses.csv")),
+              "--natural-key", "email",
+              "--supplementary", str(tmpdir.join("teams.csv")), "email",
+              "--output", str(tmpdir.join("output")),
+              "--store", str(tmpdir.join("store"))])
+    lines = capsys.readouterr().out.split("\n")
+    return [line.split()[0] for line in lines if line.endswith(" ran")]
+
+
+def test_cli_exports_summary_and_breakdown(tmpdir, capsys):
+    write_inputs(tmpdir)
+    assert run(tmpdir, capsys) == ["load", "join", "process", "summarize", "breakdown", "export"]
+
+    summary = pd.read_csv(str(tmpdir.join("output", "summary.csv")), index_col=0)
+    assert summary.loc["score", "mean"] == 17.5
+
+    breakdown = pd.read_csv(str(tmpdir.join("output", "breakdown.csv")))
+    assert list(breakdown.independent) == ["team"]
+
+
+def test_cli_restores_delimited_multi_select_questions(tmpdir, capsys):
+    write_inputs(tmpdir, DEFINITION + """    - !MultiSelectQuestion
+      text: "tools"
+      delimiter: ";"
+""")
+    tmpdir.join("responses.csv").write("email,score,tools\na,1,slack;email\nb,2,slack\nc,3,slack\nd,1,jira; slack\n")
+    run(tmpdir, capsys)
+
+    summary = pd.read_csv(str(tmpdir.join("output", "summary.csv")), index_col=0)
+    assert summary.loc["tools", "unique"] == 3
+    assert summary.loc["tools", "top"] == "('slack',)"
+
+
+def test_cli_reruns_only_stages_whose_inputs_changed(tmpdir, capsys):
+    write_inputs(tmpdir)
+    run(tmpdir, capsys)
+    assert run(tmpdir, capsys) == ["export"]
+
+    write_inputs(tmpdir, DEFINITION.replace("x * 10", "x * 100"))
+    assert run(tmpdir, capsys) == ["process", "summarize", "breakdown", "export"]
+
+
+def test_pipeline_runs_independent_stages_concurrently(tmpdir):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value):
+        barrier.wait()
+        return value + 1
+
+    pipeline = Pipeline(ArtifactStore(str(tmpdir)), workers=2)
+    pipeline.add(Stage("root", lambda: 1))\
+            .add(Stage("left", branch, inputs=["root"]))\
+            .add(Stage("right", branch, inputs=["root"]))
+    outputs = pipeline.run()
+
+    assert outputs["left"] == outputs["right"] == 2
@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+import pandas as pd
+import simplesurvey
+
+from simplesurvey.reliability import Reliability
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(8)
+    engagement = rng.normal(size=300)
+    data = pd.DataFrame({"team": rng.choice(["eng", "ops"], 300),
+                         "proud": np.round(engagement + rng.normal(scale=0.5, size=300)),
+                         "recommend": np.round(engagement + rng.normal(scale=0.5, size=300)),
+                         "stay": np.round(engagement + rng.normal(scale=0.5, size=300)),
+                         "lunch": np.round(rng.normal(size=300))})
+    return data
+
+
+@pytest.fixture
+def survey(make_survey, data):
+    scale = simplesurvey.OrdinalScale(labels=[], ratings=[], name="likert")
+    return make_survey(data,
+                       simplesurvey.Dimension("team"),
+                       simplesurvey.Question("proud", scale=scale),
+                       simplesurvey.Question("recommend", scale=scale),
+                       simplesurvey.Question("stay", scale=scale),
+                       simplesurvey.Question("lunch", construct="food"))
+
+
+def alpha(items):
+    k = items.shape[1]
+    return k / (k - 1.0) * (1 - items.var().sum() / items.sum(axis=1).var())
+
+
+def test_constructs_group_by_tag_and_scale(survey):
+    assert Reliability(survey).constructs() == {"likert": ["proud", "recommend", "stay"]}
+
+
+def test_reliability_matches_direct_computation(survey, data):
+    items = data[["proud", "recommend", "stay"]]
+
+    result = survey.reliability()["likert"]
+    assert np.isclose(result.alpha["All"], alpha(items))
+    assert np.isclose(result.alpha_if_deleted.loc["All", "stay"], alpha(items[["proud", "recommend"]]))
+
+    rest = items[["proud", "recommend"]].sum(axis=1)
+    assert np.isclose(result.item_total.loc["All", "stay"], np.corrcoef(items["stay"], rest)[0, 1])
+
+
+def test_reliability_batched_over_segments(survey, data):
+    result = survey.reliability(dimension="team")["likert"]
+    for team, group in data.groupby("team"):
+        assert np.isclose(result.alpha[team], alpha(group[["proud", "recommend", "stay"]]))
+        assert result.counts[team] == len(group)
+
+
+def test_two_item_constructs_have_no_alpha_if_deleted(survey, data):
+    survey.columns["stay"].scale = None
+    result = survey.reliability()["likert"]
+
+    assert np.isclose(result.alpha["All"], alpha(data[["proud", "recommend"]]))
+    assert result.alpha_if_deleted.isnull().all().all()
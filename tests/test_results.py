@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+import pandas as pd
+import simplesurvey
+
+from simplesurvey.results import ResultTable
+from simplesurvey.stats import MonteCarloChi2Test
+
+
+@pytest.fixture
+def survey(make_survey):
+    rng = np.random.RandomState(1)
+    department = rng.choice(["eng", "sales", "ops"], 300)
+    score = np.where(department == "eng", rng.randint(4, 6, 300), rng.randint(1, 6, 300))
+    data = pd.DataFrame({"department": department,
+                         "score": score,
+                         "noise": rng.randint(1, 6, 300)})
+
+    return make_survey(data,
+                       simplesurvey.Dimension("department"),
+                       simplesurvey.Question("score", breakdown_by=True),
+                       simplesurvey.Question("noise", breakdown_by=True))
+
+
+def test_breakdown_by_dimensions_returns_result_table(survey):
+    result = survey.breakdown_by_dimensions()
+
+    assert isinstance(result, ResultTable)
+    assert sorted(result.dependent) == ["noise", "score"]
+    assert list(result.test) == ["Chi2Test", "Chi2Test"]
+
+
+def test_breakdown_by_dimensions_filters_on_threshold(survey):
+    result = survey.breakdown_by_dimensions(threshold=0.05, correction="bonferroni")
+
+    assert list(result.dependent) == ["score"]
+    assert result.adjusted_pvalue[0] < 0.05
+
+
+def test_result_table_streams_csv_in_chunks(tmpdir):
+    table = ResultTable(test=["Chi2Test"] * 5,
+                        dependent=list("abcde"),
+                        independent=["dim"] * 5,
+                        test_statistic=range(5),
+                        pvalue=[0.5, 0.01, 0.2, 0.001, 0.04])
+    table.adjust("holm")
+
+    path = table.to_csv(str(tmpdir.join("results.csv")), chunksize=2)
+    result = pd.read_csv(path)
+
+    assert list(result.columns) == ResultTable.columns
+    assert list(result.dependent) == list("abcde")
+    assert np.allclose(result.adjusted_pvalue, table.adjusted_pvalue)
+
+
+def test_result_table_labels_each_test_class(survey):
+    survey.dimensions[0].breakdown_by = MonteCarloChi2Test
+    result = survey.breakdown_by_dimensions()
+
+    assert list(result.test) == ["MonteCarloChi2Test", "MonteCarloChi2Test"]
+    single = MonteCarloChi2Test(permutations=100).test(survey.dimensions[0], survey.columns["score"])
+    assert ResultTable.from_results([single]).test[0] == "MonteCarloChi2Test"
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import pytest
+import threading
+
+from urllib.request import urlopen
+from urllib.error import HTTPError
+from simplesurvey.server import SurveyRegistry, SurveyServer, SurveySource
+
+DEFINITION = """
+--- !Survey
+scales:
+    - !OrdinalScale
+      &three_point
+      labels: ["Disagree", "Neutral", "Agree"]
+      ratings: [1, 2, 3]
+questions:
+    - !Question
+      text: "score"
+      scale: *three_point
+      breakdown_by: true
+    - !Dimension
+      text: "team"
+"""
+
+
+@pytest.fixture
+def server(tmpdir):
+    tmpdir.join("survey.yaml").write(DEFINITION)
+    tmpdir.join("responses.csv").write("team,score\neng,Agree\neng,Agree\nops,Disagree\nops,Neutral\n")
+
+    registry = SurveyRegistry()
+    registry.register("pulse", SurveySource(str(tmpdir.join("survey.yaml")), str(tmpdir.join("responses.csv"))))
+    server = SurveyServer(registry.watch(interval=0.05))
+    server.start()
+    yield server
+    server.stop()
+
+
+def get(server, path):
+    with urlopen(server.url + path) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def test_server_answers_queries_from_cache(server):
+    assert get(server, "/surveys") == ["pulse"]
+
+    result = get(server, "/surveys/pulse/crosstab?ind=team&dep=score")
+    assert result["index"] == ["eng", "ops"]
+    assert result["columns"] == [1, 2, 3]
+    assert result["data"] == [[0, 0, 2], [1, 1, 0]]
+
+    get(server, "/surveys/pulse/crosstab?ind=team&dep=score")
+    assert (server.registry.hits, server.registry.misses) == (1, 1)
+
+    summary = get(server, "/surveys/pulse/summarize?cols=score")
+    assert summary["index"] == ["Average", "Median"]
+
+
+def test_server_rejects_unknown_surveys_and_columns(server):
+    with pytest.raises(HTTPError) as error:
+        get(server, "/surveys/missing/crosstab")
+    assert error.value.code == 404
+
+    with pytest.raises(HTTPError) as error:
+        get(server, "/surveys/pulse/crosstab?ind=team&dep=missing")
+    assert error.value.code == 400
+
+    with pytest.raises(HTTPError) as error:
+        get(server, "/surveys/pulse/summarize?cols=team")
+    assert error.value.code == 500
+    assert "error" in json.loads(error.value.read().decode("utf-8"))
+
+
+def test_server_reloads_changed_surveys_in_background(server, tmpdir):
+    assert len(get(server, "/surveys/pulse/slice?cols=score")["data"]) == 4
+
+    path = tmpdir.join("responses.csv")
+    path.write("team,score\neng,Agree\n")
+    os.utime(str(path), (time.time() + 1, time.time() + 1))
+
+    deadline = time.time() + 5
+    while len(get(server, "/surveys/pulse/slice?cols=score")["data"]) != 1:
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+
+def test_registry_evicts_least_recently_used_over_budget(tmpdir):
+    tmpdir.join("survey.yaml").write(DEFINITION)
+    tmpdir.join("responses.csv").write("team,score\neng,Agree\n")
+    source = SurveySource(str(tmpdir.join("survey.yaml")), str(tmpdir.join("responses.csv")))
+
+    registry = SurveyRegistry(max_bytes=1)
+    registry.register("first", source).register("second", source)
+    registry.get("first")
+    registry.get("second")
+    assert list(registry._surveys) == ["second"]
+
+
+def test_registry_loads_a_survey_once_for_concurrent_requests(tmpdir):
+    tmpdir.join("survey.yaml").write(DEFINITION)
+    tmpdir.join("responses.csv").write("team,score\neng,Agree\n")
+    source = SurveySource(str(tmpdir.join("survey.yaml")), str(tmpdir.join("responses.csv")))
+
+    loads = []
+    load = source.load
+
+    def counted():
+        loads.append(1)
+        time.sleep(0.1)
+        return load()
+    source.load = counted
+
+    registry = SurveyRegistry().register("pulse", source)
+    threads = [threading.Thread(target=registry.get, args=("pulse",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
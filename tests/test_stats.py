@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+import simplesurvey
+
+from simplesurvey.cache import ResultCache
+from simplesurvey.stats import adjust_pvalues, PairwiseChi2Test, PairwiseRankTest, MonteCarloChi2Test, KruskallWallisTest
+
+
+def loaded_columns(independent, dependent):
+    dimension = simplesurvey.Dimension("dimension")
+    dimension.load(pd.Series(independent, name="dimension"))
+    question = simplesurvey.Question("question")
+    question.load(pd.Series(dependent, name="question"))
+    return dimension, question
+
+
+def test_adjust_pvalues_bonferroni_holm_and_bh():
+    pvalues = np.array([0.01, 0.04, 0.03, np.nan])
+
+    assert np.allclose(adjust_pvalues(pvalues, "bonferroni")[:3], [0.03, 0.12, 0.09])
+    assert np.allclose(adjust_pvalues(pvalues, "holm")[:3], [0.03, 0.06, 0.06])
+    assert np.allclose(adjust_pvalues(pvalues, "fdr_bh")[:3], [0.03, 0.04, 0.04])
+    assert np.isnan(adjust_pvalues(pvalues, "holm")[3])
+
+
+def test_pairwise_chi2_matches_scipy_per_pair():
+    rng = np.random.RandomState(0)
+    dimension, question = loaded_columns(rng.choice(list("abcd"), 400), rng.randint(1, 4, 400))
+
+    result = PairwiseChi2Test(correction=None).test(dimension, question)
+    assert len(result.pairs) == 6
+
+    table = pd.crosstab(dimension._data, question._data)
+    for (first, second), statistic, pvalue in zip(result.pairs, result.statistic, result.pvalue):
+        expected = stats.chi2_contingency(table.loc[[first, second]])
+        assert np.isclose(statistic, expected[0])
+        assert np.isclose(pvalue, expected[1])
+
+
+def test_pairwise_rank_test_finds_shifted_category():
+    independent = ["a"] * 50 + ["b"] * 50 + ["c"] * 50
+    dependent = [1, 2, 3, 4, 5] * 20 + [4, 5, 5, 5, 5] * 10
+    dimension, question = loaded_columns(independent, dependent)
+
+    result = PairwiseRankTest().test(dimension, question)
+    assert result.significant(0.05) == [("a", "c"), ("b", "c")]
+
+
+def test_posthoc_skipped_when_omnibus_not_significant():
+    dimension, question = loaded_columns(["a", "a", "b", "b"] * 25, [1, 2] * 50)
+    assert dimension.posthoc(question, threshold=0.05) is None
+
+
+def test_monte_carlo_chi2_agrees_with_asymptotic_pvalue():
+    rng = np.random.RandomState(5)
+    dimension, question = loaded_columns(rng.choice(list("abc"), 300), rng.randint(1, 4, 300))
+
+    result = MonteCarloChi2Test(permutations=4000, threshold=None, seed=1).test(dimension, question)
+    expected = stats.chi2_contingency(pd.crosstab(dimension._data, question._data))
+
+    assert result.permutations == 4000
+    assert np.isclose(result.test_statistic, expected[0])
+    assert abs(result.pvalue - expected[1]) < 0.05
+
+
+def test_monte_carlo_chi2_stops_early_once_decided():
+    dimension, question = loaded_columns(["a"] * 30 + ["b"] * 30, [1] * 28 + [2] * 30 + [1] * 2)
+
+    result = MonteCarloChi2Test(permutations=10000, batch_size=200, seed=1).test(dimension, question)
+    assert result.permutations == 200
+    assert result.pvalue < 0.05
+
+    capped = MonteCarloChi2Test(permutations=10000, block_size=60 * 50, seed=1).test(dimension, question)
+    assert capped.permutations == 150
+
+
+def test_monte_carlo_chi2_is_reproducible_by_default():
+    rng = np.random.RandomState(5)
+    dimension, question = loaded_columns(rng.choice(list("ab"), 80), rng.randint(1, 6, 80))
+
+    first = MonteCarloChi2Test(permutations=500, threshold=None).test(dimension, question)
+    second = MonteCarloChi2Test(permutations=500, threshold=None).test(dimension, question)
+    assert first.pvalue == second.pvalue
+
+
+def test_monte_carlo_chi2_is_deterministic_across_processes():
+    rng = np.random.RandomState(6)
+    dimension, question = loaded_columns(rng.choice(list("ab"), 80), rng.randint(1, 6, 80))
+
+    serial = MonteCarloChi2Test(permutations=1000, batch_size=100, seed=3).test(dimension, question)
+    parallel = MonteCarloChi2Test(permutations=1000, batch_size=100, seed=3, processes=2).test(dimension, question)
+    assert serial.pvalue == parallel.pvalue
+    assert serial.permutations == parallel.permutations
+
+
+def test_kruskal_wallis_breakdown_matches_scipy_with_string_categories(tmpdir):
+    rng = np.random.RandomState(2)
+    dimension, question = loaded_columns(rng.choice(list("abc"), 120), rng.randint(1, 6, 120))
+    dimension.breakdown_by = KruskallWallisTest
+
+    data = pd.DataFrame({"dimension": dimension._data, "question": question._data})
+    expected = stats.kruskal(*[group.question for _, group in data.groupby("dimension")])
+
+    result = dimension.breakdown_with(question)
+    assert np.isclose(result.test_statistic, expected[0])
+    assert np.isclose(result.pvalue, expected[1])
+    assert result.degrees_of_freedom == 2
+
+    cached = dimension.breakdown_statistics(question, cache=ResultCache(str(tmpdir)))
+    assert cached[0] == "KruskallWallisTest"
+    assert np.allclose(cached[1:], (expected[0], expected[1], 2))
@@ -5,6 +5,7 @@ import numpy as np
 import simplesurvey
 
 from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 
 
 class MockResponse:
@@ -42,6 +43,22 @@ def test_typeform_fetch_and_index_responses_by_id():
     assert result == pd.Index(["j.crew@gmail.com"])
 
 
+def test_typeform_fetch_collapses_choices_sharing_a_field_id():
+    data = {
+        'questions': [{'field_id': 1, 'id': 'email_1', 'question': "Email"},
+                      {'field_id': 2, 'id': 'list_2_choice_1', 'question': "Tools"},
+                      {'field_id': 2, 'id': 'list_2_choice_2', 'question': "Tools"}],
+        'responses': [{'completed': '1', 'answers': {'email_1': 'a', 'list_2_choice_1': 'Slack', 'list_2_choice_2': 'Email'}},
+                      {'completed': '1', 'answers': {'email_1': 'b', 'list_2_choice_2': 'Email'}}],
+    }
+
+    with mock.patch('requests.get', side_effect=lambda *args, **kwargs: MockResponse(data, 200)):
+        test_survey = simplesurvey.TypeFormSurvey()
+        test_survey.fetch(index="Email")
+
+    assert list(test_survey._responses["Tools"]) == [["Slack", "Email"], ["Email"]]
+
+
 def test_loading_typeform_survey_from_yaml():
     document = """
 --- !TypeFormSurvey
@@ -185,6 +202,33 @@ def test_supplementary_data_overlapping_throws_exception(tmpdir):
         survey.process()
 
 
+def test_duplicate_responses_resolved_before_joining_supplementary_data():
+    responses = pd.DataFrame({"email": ["a@x.com", "b@x.com", "a@x.com"],
+                              "submitted": [2, 1, 1],
+                              "score": [5, 3, 1]})
+    supplementary = pd.DataFrame({"email": ["b@x.com", "a@x.com", "a@x.com"],
+                                  "team": ["ops", "old", "eng"]})
+
+    survey = simplesurvey.Survey()
+    survey.responses(responses, natural_key="email", order_by="submitted")\
+          .supplementary_data(supplementary, natural_key="email")\
+          .add_column(simplesurvey.Question("score"))\
+          .add_column(simplesurvey.Dimension("team"))\
+          .process()
+
+    result = survey.data
+    assert len(result) == 2
+    assert result.loc["a@x.com", "score"] == 5
+    assert result.loc["a@x.com", "team"] == "eng"
+
+
+def test_duplicate_responses_raise_with_error_policy():
+    responses = pd.DataFrame({"email": ["a@x.com", "a@x.com"], "score": [5, 1]})
+
+    with pytest.raises(simplesurvey.DuplicateKeyException):
+        simplesurvey.Survey().responses(responses, natural_key="email", duplicates="error")
+
+
 def test_responses_with_no_natural_key_raises_when_supplementary_data_added(
         tmpdir):
     survey = simplesurvey.Survey()
@@ -203,6 +247,21 @@ def test_responses_with_no_natural_key_raises_when_supplementary_data_added(
         survey.process()
 
 
+def test_pre_indexed_responses_join_supplementary_data_on_index():
+    responses = pd.DataFrame({"score": [5, 3]}, index=pd.Index(["a@x.com", "b@x.com"], name="email"))
+    supplementary = pd.DataFrame({"email": ["b@x.com", "a@x.com"], "team": ["ops", "eng"]})
+
+    survey = simplesurvey.Survey()
+    survey.responses(responses)\
+          .supplementary_data(supplementary, natural_key="email")\
+          .add_column(simplesurvey.Question("score"))\
+          .add_column(simplesurvey.Dimension("team"))\
+          .process()
+
+    assert survey.data.loc["a@x.com", "team"] == "eng"
+    assert survey.data.loc["b@x.com", "team"] == "ops"
+
+
 def test_add_question_to_survey():
     test_question = simplesurvey.Question("A test column")
     survey = simplesurvey.Survey()
@@ -310,3 +369,130 @@ def test_survey_summary_returns_summarizer_with_loaded_columns():
 
     result = survey.summarize(['a'])
     assert isinstance(result, simplesurvey.Summarizer)
+
+
+@pytest.fixture
+def multi_select_survey(make_survey):
+    data = pd.DataFrame({"team": ["eng", "eng", "ops", "ops"],
+                         "tools": ["slack, email", "slack", None, "email, jira, slack"]})
+    survey = make_survey(data, simplesurvey.Dimension("team"), simplesurvey.MultiSelectQuestion("tools", delimiter=","))
+    survey.process()
+    return survey
+
+
+def test_multi_select_question_counts_and_cooccurrence(multi_select_survey):
+    tools = multi_select_survey.columns["tools"]
+
+    assert tools.selections.nnz == 6
+    assert tools.frequencies().to_dict() == {"email": 2, "jira": 1, "slack": 3}
+    assert tools.cooccurrence().loc["email", "slack"] == 2
+    assert tools.cooccurrence().loc["jira", "jira"] == 1
+    assert list(tools.data) == [("email", "slack"), ("slack",), (), ("email", "jira", "slack")]
+
+
+def test_multi_select_question_breakdown_by_dimension(multi_select_survey):
+    survey = multi_select_survey
+
+    result = survey.columns["tools"].breakdown(survey.columns["team"])
+    assert result.loc["eng"].to_dict() == {"email": 1, "jira": 0, "slack": 2}
+    assert result.loc["ops"].to_dict() == {"email": 1, "jira": 1, "slack": 1}
+
+
+def test_multi_select_question_infers_options_on_every_load():
+    tools = simplesurvey.MultiSelectQuestion("tools", delimiter=",")
+    tools.load(pd.Series(["a,b", "b"]))
+    tools.load(pd.Series(["a,c", "c"]))
+    assert tools.frequencies().to_dict() == {"a": 1, "c": 2}
+
+    fixed = simplesurvey.MultiSelectQuestion("tools", options=["a", "b"], delimiter=",")
+    fixed.load(pd.Series(["a,c", "c"]))
+    assert fixed.frequencies().to_dict() == {"a": 1, "b": 0}
+
+
+@pytest.fixture
+def snapshot(make_survey):
+    data = pd.DataFrame({"team": ["eng", "ops"] * 50, "score": [1, 2, 3, 4, 5] * 20})
+    survey = make_survey(data,
+                         simplesurvey.Dimension("team"),
+                         simplesurvey.Question("score", breakdown_by=True).add_transform(lambda x: x * 10))
+    return survey.freeze(build_index=True)
+
+
+def test_frozen_survey_shares_read_only_data(snapshot):
+    score = snapshot.columns["score"]
+
+    assert np.shares_memory(score.data.values, score.data.values)
+    assert not score.data.values.flags.writeable
+    assert list(snapshot.data["score"][:5]) == [10, 20, 30, 40, 50]
+
+    data = score.data
+    with pytest.raises(ValueError):
+        data.values[0] = 1
+    with pytest.raises(ValueError):
+        data.iloc[0] = 999
+    data.name = "zzz"
+    assert score.data.iloc[0] == 10
+    assert score.data.name == "score"
+
+
+def test_freezing_a_read_survey_applies_transforms_once(make_survey):
+    data = pd.DataFrame({"score": [1, 2]})
+    survey = make_survey(data, simplesurvey.Question("score").add_transform(lambda x: x * 10))
+    survey.process()
+    assert list(survey.data["score"]) == [10, 20]
+
+    frozen = survey.freeze()
+
+    assert list(frozen.data["score"]) == [10, 20]
+    assert list(survey.data["score"]) == [10, 20]
+
+
+def test_frozen_survey_rejects_changes(snapshot):
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.process()
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.add_column(simplesurvey.Question("other"))
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.columns["score"].add_filter(lambda x: x > 1)
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.columns["score"].load(pd.Series([1, 2]))
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.columns["score"].restore(pd.Series([1, 2]))
+    with pytest.raises(simplesurvey.FrozenSurveyException):
+        snapshot.columns["team"].restore(pd.Series(["eng"]))
+
+
+def test_frozen_survey_concurrent_reads_are_consistent(snapshot):
+    expected = snapshot.crosstab("team", "score")
+
+    def read(_):
+        table = snapshot.crosstab("team", "score")
+        summary = snapshot.summarize(["score"]).average().row_summary()
+        segment = snapshot.segment(team="eng").crosstab("team", "score")
+        pvalue = snapshot.breakdown_by_dimensions().pvalue[0]
+        return table.equals(expected), summary.loc["Average", "score"], int(segment.values.sum()), pvalue
+
+    with ThreadPoolExecutor(8) as executor:
+        results = set(executor.map(read, range(64)))
+
+    assert len(results) == 1
+    assert list(results)[0][:3] == (True, 30.0, 50)
+
+
+def test_snapshot_of_read_survey_is_consistent_across_threads(make_survey):
+    data = pd.DataFrame({"team": ["eng", "ops"] * 50, "score": [1, 2, 3, 4, 5] * 20})
+    survey = make_survey(data,
+                         simplesurvey.Dimension("team"),
+                         simplesurvey.Question("score").add_transform(lambda x: x * 10))
+    survey.process()
+    survey.summarize(["score"]).average().row_summary()
+    snapshot = survey.freeze(build_index=True)
+
+    def read(_):
+        return tuple(snapshot.columns["score"].data[:5]), snapshot.summarize(["score"]).average().row_summary().loc["Average", "score"]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = set(executor.map(read, range(64)))
+
+    assert results == {((10, 20, 30, 40, 50), 30.0)}
+    assert list(survey.data["score"][:5]) == [10, 20, 30, 40, 50]
@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+import simplesurvey
+
+from simplesurvey.stats import RaoScottChi2Test
+from simplesurvey.weighting import Raking
+
+
+@pytest.fixture
+def survey(make_survey):
+    data = pd.DataFrame({"office": ["ottawa"] * 6 + ["toronto"] * 2,
+                         "role": ["eng", "eng", "eng", "eng", "sales", "sales", "eng", "sales"],
+                         "score": [1, 2, 3, 4, 5, 5, 4, 2]})
+    return make_survey(data,
+                       simplesurvey.Dimension("office"),
+                       simplesurvey.Dimension("role"),
+                       simplesurvey.Question("score", breakdown_by=True))
+
+
+def test_raking_matches_target_margins(survey):
+    survey.rake({"office": {"ottawa": 0.5, "toronto": 0.5},
+                 "role": {"eng": 0.6, "sales": 0.4}})
+
+    data = survey.slice(["office", "role"])
+    office = survey.weights.groupby(data["office"]).sum() / survey.weights.sum()
+    role = survey.weights.groupby(data["role"]).sum() / survey.weights.sum()
+
+    assert np.allclose(office[["ottawa", "toronto"]], [0.5, 0.5])
+    assert np.allclose(role[["eng", "sales"]], [0.6, 0.4])
+    assert np.isclose(survey.weights.mean(), 1)
+
+
+def test_raking_leaves_missing_categories_unadjusted():
+    weights = Raking().fit([np.array([0, 0, 1, -1])], [[0.5, 0.5]])
+    assert np.isclose(weights[0] * 2, weights[2])
+
+
+def test_weighted_crosstab_and_summaries(survey):
+    survey.rake({"office": {"ottawa": 0.5, "toronto": 0.5}})
+
+    table = survey.crosstab("office", "score", weighted=True)
+    assert np.isclose(table.loc["ottawa"].sum(), table.loc["toronto"].sum())
+
+    summary = survey.summarize(["score"]).weighted_average().weighted_quantile(0.5).row_summary()
+    assert np.isclose(summary.loc["Weighted Average", "score"], (20 / 6 + 6 / 2) / 2)
+    assert "Weighted 50th Percentile" in summary.index
+
+
+def test_rao_scott_with_constant_weights_is_pearson_chi2():
+    dimension = simplesurvey.Dimension("dimension")
+    dimension.load(pd.Series(list("aaaaabbbbb") * 20))
+    question = simplesurvey.Question("question")
+    question.load(pd.Series([1, 1, 1, 1, 2, 2, 2, 2, 2, 1] * 20))
+
+    unit = RaoScottChi2Test(pd.Series(np.ones(200))).test(dimension, question)
+    constant = RaoScottChi2Test(pd.Series(np.full(200, 3.0))).test(dimension, question)
+    expected = stats.chi2_contingency(pd.crosstab(dimension._data, question._data), correction=False)
+
+    assert np.isclose(expected[0], 72)
+    assert np.isclose(unit.test_statistic, expected[0])
+    assert np.isclose(unit.pvalue, expected[1])
+    assert np.isclose(constant.test_statistic, expected[0])
+    assert unit.test_name == "RaoScottChi2Test"
+
+
+def test_rao_scott_with_empty_cells_is_pearson_chi2_under_unit_weights():
+    dimension = simplesurvey.Dimension("dimension")
+    dimension.load(pd.Series(list("aabbcc") * 10))
+    question = simplesurvey.Question("question")
+    question.load(pd.Series([1, 2, 1, 3, 2, 3] * 10))
+
+    result = RaoScottChi2Test(pd.Series(np.ones(60))).test(dimension, question)
+    expected = stats.chi2_contingency(pd.crosstab(dimension._data, question._data), correction=False)
+    assert np.isclose(result.test_statistic, expected[0])
+
+
+def test_breakdown_uses_rao_scott_once_weighted(survey):
+    assert list(survey.breakdown_by_dimensions().test) == ["Chi2Test", "Chi2Test"]
+
+    survey.rake({"office": {"ottawa": 0.5, "toronto": 0.5}})
+    result = survey.breakdown_by_dimensions()
+    assert list(result.test) == ["RaoScottChi2Test", "RaoScottChi2Test"]
+
+    survey.columns["office"].breakdown_by = RaoScottChi2Test
+    survey.weights = None
+    with pytest.raises(ValueError):
+        survey.breakdown_by_dimensions()
+
+
+def test_weighted_crosstab_needs_weights(survey):
+    with pytest.raises(ValueError):
+        survey.crosstab("office", "score", weighted=True)